@@ -0,0 +1,14 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+
+import os
+import tempfile
+
+# Benchmarks must never touch the real data folder, log file or database,
+# so the configuration is pointed to a scratch folder before common.config is imported.
+BENCHMARK_FOLDER = tempfile.mkdtemp(prefix="update_elected_bench_")
+os.environ["OUTPUT_FOLDER"] = BENCHMARK_FOLDER
+os.environ["LOG_PATH"] = os.path.join(BENCHMARK_FOLDER, "benchmark.log")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("POSTGRES_PASSWORD", "benchmark")
@@ -0,0 +1,175 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Compare the per record overhead of the former async constructors, one coroutine
+and one async generator step per record, with the synchronous batch builders.
+
+Usage: python -m benchmark.builders [--count 100000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List
+
+import benchmark
+from benchmark.fixtures import (
+    DEPUTIES_COUNT,
+    iter_elected_values,
+    make_deputies_documents,
+)
+from process.core import Elected
+from process.organe import Organe, OrganeIndex
+from process.schema import trim_acteur, trim_organe
+
+BATCH_SIZE = 256
+
+
+async def build_async(build: Callable[[Any], Elected], data: Any) -> Elected:
+    """The former constructors: declared async, without anything to await."""
+    return build(data)
+
+
+async def per_record(
+    build: Callable[[Any], Elected], rows: List[Any]
+) -> AsyncIterator[Elected]:
+    for data in rows:
+        yield await build_async(build, data)
+
+
+async def per_batch(
+    build_rows: Callable[[List[Any]], List[Elected]], rows: List[Any]
+) -> AsyncIterator[List[Elected]]:
+    for start in range(0, len(rows), BATCH_SIZE):
+        yield build_rows(rows[start : start + BATCH_SIZE])
+
+
+async def add(member: Elected) -> None:
+    """Stands for passing one member to OutputWriter.serialize."""
+
+
+async def add_batch(members: List[Elected]) -> None:
+    """Stands for passing a batch of members to OutputWriter.serialize."""
+
+
+async def consume_per_record(build: Callable[[Any], Elected], rows: List[Any]) -> None:
+    async for elected in per_record(build, rows):
+        await add(elected)
+
+
+async def consume_per_batch(
+    build_rows: Callable[[List[Any]], List[Elected]], rows: List[Any]
+) -> None:
+    async for batch in per_batch(build_rows, rows):
+        await add_batch(batch)
+
+
+async def run(name: str, consume: Callable[[], Any], count: int, repeat: int) -> None:
+    durations: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await consume()
+        durations.append(time.perf_counter() - start)
+    best = min(durations)
+    print(f"{name:<24} best {best * 1000:8.1f} ms  {best / count * 1e6:6.2f} us/record")
+
+
+def senat_rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "senmat": values["ref"],
+            "quacod": values["civ"],
+            "sennomuse": values["last_name"],
+            "senprenomuse": values["first_name"],
+            "senema": values["email"],
+            "dptcod": values["departement_num"],
+            "dptlib": values["departement_name"],
+            "grppolcod": values["group_abv"],
+            "grppollilcou": values["group_name"],
+        }
+        for values in iter_elected_values(count)
+    ]
+
+
+def europarl_rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "mep_identifier": values["ref"],
+            "mep_honorific_prefix": values["civ"],
+            "mep_family_name": values["last_name"],
+            "mep_given_name": values["first_name"],
+            "mep_email": values["email"],
+            "mep_country_of_representation": values["country"],
+            "mep_political_group": values["group_name"],
+        }
+        for values in iter_elected_values(count)
+    ]
+
+
+async def main(count: int, repeat: int) -> None:
+    for name, rows, build, build_rows in (
+        ("senat", senat_rows(count), Elected.from_senat, Elected.from_senat_rows),
+        (
+            "europarl",
+            europarl_rows(count),
+            Elected.from_europarl_csv,
+            Elected.from_europarl_rows,
+        ),
+    ):
+        await run(
+            f"{name} per record",
+            lambda: consume_per_record(build, rows),
+            count,
+            repeat,
+        )
+        await run(
+            f"{name} batched",
+            lambda: consume_per_batch(build_rows, rows),
+            count,
+            repeat,
+        )
+
+    # The acteur documents are much larger than the rows, their count is capped
+    documents = make_deputies_documents(min(count / DEPUTIES_COUNT, 10))
+    acteurs = [
+        trim_acteur(document)
+        for name, document in documents.items()
+        if name.startswith("json/acteur/")
+    ]
+    organes = OrganeIndex(
+        {
+            organe.uid: organe
+            for organe in (
+                Organe.from_json(trim_organe(document))
+                for name, document in documents.items()
+                if name.startswith("json/organe/")
+            )
+        }
+    )
+    await run(
+        "deputies per record",
+        lambda: consume_per_record(
+            lambda data: Elected.from_deputy_json(data, organes), acteurs
+        ),
+        len(acteurs),
+        repeat,
+    )
+    await run(
+        "deputies batched",
+        lambda: consume_per_batch(
+            lambda documents: Elected.from_deputy_jsons(documents, organes), acteurs
+        ),
+        len(acteurs),
+        repeat,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.repeat))
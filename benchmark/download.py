@@ -0,0 +1,103 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Compare the download throughput of the former 4 KiB blocking writer
+with the buffered writer of Downloader, against a local stand-in server.
+
+Usage: python -m benchmark.download [--size-mb 64] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+import benchmark
+from benchmark.server import serve_in_thread
+from download.core import Downloader
+
+
+async def legacy_download(downloader: Downloader, url: str, file_path: Path) -> None:
+    """The download loop before the buffered writer: 4 KiB reads and blocking writes."""
+    async with downloader.session.get(url) as response:
+        response.raise_for_status()
+        with open(file_path, "wb") as f:
+            while True:
+                chunk = await response.content.read(4096)
+                if not chunk:
+                    break
+                f.write(chunk)
+
+
+async def buffered_download(downloader: Downloader, url: str, file_path: Path) -> None:
+    await downloader.download(url, file_path, force=True)
+
+
+async def measure_loop_lag(stop: asyncio.Event, lags: List[float]) -> None:
+    """Records how late the event loop wakes up a sleeping coroutine."""
+    interval = 0.001
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(
+    name: str,
+    download: Callable[[Downloader, str, Path], Awaitable[None]],
+    downloader: Downloader,
+    url: str,
+    size: int,
+    repeat: int,
+) -> None:
+    file_path = Path(benchmark.BENCHMARK_FOLDER) / "download.bin"
+    durations: List[float] = []
+    lags: List[float] = []
+    for _ in range(repeat):
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop, lags))
+        start = time.perf_counter()
+        await download(downloader, url, file_path)
+        durations.append(time.perf_counter() - start)
+        stop.set()
+        await lag_task
+        assert os.path.getsize(file_path) == size
+
+    best = min(durations)
+    print(
+        f"{name:<24} best {best:.3f}s  {size / best / 1024 / 1024:8.1f} MB/s  "
+        f"max loop lag {max(lags) * 1000:.1f} ms"
+    )
+
+
+async def main(size_mb: int, repeat: int) -> None:
+    size = size_mb * 1024 * 1024
+    with serve_in_thread({"/file.bin": os.urandom(size)}) as server:
+        url = server.url("/file.bin")
+        async with Downloader() as downloader:
+            await run(
+                "legacy 4 KiB blocking", legacy_download, downloader, url, size, repeat
+            )
+            for chunk_size in (64 * 1024, 1024 * 1024, 4 * 1024 * 1024):
+                downloader.chunk_size = chunk_size
+                await run(
+                    f"buffered {chunk_size // 1024} KiB",
+                    buffered_download,
+                    downloader,
+                    url,
+                    size,
+                    repeat,
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb, args.repeat))
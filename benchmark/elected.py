@@ -0,0 +1,138 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Compare the memory and the time to build and serialize Elected records
+with the former mutable record serialized through to_dict.
+
+Usage: python -m benchmark.elected [--count 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+from attrs import define
+
+import benchmark
+from benchmark.fixtures import iter_elected_values
+from process.core import Elected
+from process.output import YAML_DUMPER, JsonFormat, YamlFormat
+
+
+@define
+class LegacyElected:
+    """Elected before the frozen records: a mutable attrs class without interned values."""
+
+    ref: str
+    civ: str
+    last_name: str
+    first_name: str
+    email: str
+    departement_num: str
+    departement_name: str
+    circonscription_num: str
+    circonscription_name: str
+    circonscription_code: str
+    country: str
+    group_abv: str
+    group_name: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ref": self.ref,
+            "civ": self.civ,
+            "last_name": self.last_name,
+            "first_name": self.first_name,
+            "email": self.email,
+            "departement_num": self.departement_num,
+            "departement_name": self.departement_name,
+            "circonscription_num": self.circonscription_num,
+            "circonscription_name": self.circonscription_name,
+            "circonscription_code": self.circonscription_code,
+            "country": self.country,
+            "group_abv": self.group_abv,
+            "group_name": self.group_name,
+        }
+
+
+def measure(function: Callable[[], Any]) -> Tuple[Any, float, int, int]:
+    """
+    Runs function, returns its result, its duration, the memory it kept and its peak memory.
+    It is timed on a first run, as tracing the memory slows it down, and traced on a second one.
+    """
+    start = time.perf_counter()
+    function()
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = function()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, current, peak
+
+
+def report(name: str, duration: float, count: int, memory: int, label: str) -> None:
+    print(
+        f"{name:<28} {duration * 1000:8.1f} ms  "
+        f"{duration / count * 1e6:6.2f} us/record  "
+        f"{label} {memory / 1024 / 1024:7.1f} MB"
+    )
+
+
+def legacy_yaml(records: List[LegacyElected]) -> str:
+    members = {record.ref: record.to_dict() for record in records}
+    return yaml.dump({"members": members}, Dumper=YAML_DUMPER)
+
+
+def legacy_json(records: List[LegacyElected]) -> str:
+    members = {record.ref: record.to_dict() for record in records}
+    return json.dumps({"members": members}, ensure_ascii=False, sort_keys=True)
+
+
+def streaming(
+    output_format: YamlFormat | JsonFormat, records: List[Elected]
+) -> List[str]:
+    """Serializes the records by batches like OutputWriter, without the files."""
+    batch_size = 256
+    return [
+        output_format.members(
+            [(record.ref, record) for record in records[start : start + batch_size]],
+            start == 0,
+        )
+        for start in range(0, len(records), batch_size)
+    ]
+
+
+def main(count: int) -> None:
+    print(f"{count} records")
+
+    legacy, duration, current, _ = measure(
+        lambda: [LegacyElected(**values) for values in iter_elected_values(count)]
+    )
+    report("build legacy", duration, count, current, "kept")
+    records, duration, current, _ = measure(
+        lambda: [Elected(**values) for values in iter_elected_values(count)]
+    )
+    report("build frozen + interned", duration, count, current, "kept")
+
+    for name, serialize in (
+        ("yaml legacy (to_dict)", lambda: legacy_yaml(legacy)),
+        ("yaml streaming", lambda: streaming(YamlFormat(), records)),
+        ("json legacy (to_dict)", lambda: legacy_json(legacy)),
+        ("json streaming", lambda: streaming(JsonFormat(), records)),
+    ):
+        _, duration, _, peak = measure(serialize)
+        report(name, duration, count, peak, "peak")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+    main(args.count)
@@ -0,0 +1,459 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Generators of synthetic upstream files, shaped like the real ones.
+Scale 1 is about the size of the real files, scale 10 ten times more members, etc.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import random
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from process.core import Elected
+
+# Number of members of each chamber at scale 1
+DEPUTIES_COUNT = 577
+GROUPS_COUNT = 11
+# Mandats of an acteur besides its deputy and group mandats (commissions, delegations...)
+OTHER_MANDATS_COUNT = 30
+
+
+def _xsi_nil() -> Dict[str, str]:
+    return {
+        "@xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+        "@xsi:nil": "true",
+    }
+
+
+def make_mandat(rng: random.Random, acteur_uid: str, index: int) -> Dict[str, Any]:
+    """A mandat in an organe that does not describe the deputy, like a commission."""
+    return {
+        "@xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+        "@xsi:type": "MandatSimple_Type",
+        "uid": f"PM{rng.randrange(10**6)}",
+        "acteurRef": acteur_uid,
+        "legislature": "17",
+        "typeOrgane": rng.choice(["COMPER", "GE", "DELEG", "CMP", "GA", "ORGEXTPARL"]),
+        "dateDebut": "2024-07-18",
+        "datePublication": "2024-07-19",
+        "dateFin": None,
+        "preseance": str(index),
+        "nominPrincipale": "1",
+        "infosQualite": {
+            "codeQualite": "Membre",
+            "libQualite": "Membre",
+            "libQualiteSex": "Membre",
+        },
+        "organes": {"organeRef": f"PO{700000 + rng.randrange(5000)}"},
+        "suppleants": None,
+        "chambre": None,
+        "election": None,
+        "mandature": None,
+        "collaborateurs": None,
+    }
+
+
+def make_acteur(rng: random.Random, index: int, groups_count: int) -> Dict[str, Any]:
+    """An AMO10 acteur document with its deputy mandat, group mandat and other mandats."""
+    uid = f"PA{700000 + index}"
+    num_departement = str(1 + index % 95)
+    num_circo = str(1 + (index // 95) % 12)
+    mandats: List[Dict[str, Any]] = [
+        {
+            "@xsi:type": "MandatParlementaire_type",
+            "uid": f"PM{800000 + index}",
+            "acteurRef": uid,
+            "legislature": "17",
+            "typeOrgane": "ASSEMBLEE",
+            "dateDebut": "2024-07-08",
+            "dateFin": None,
+            "infosQualite": {"codeQualite": "membre", "libQualite": "membre"},
+            "organes": {"organeRef": "PO838901"},
+            "suppleants": {
+                "suppleant": {
+                    "dateDebut": "2024-07-08",
+                    "dateFin": None,
+                    "suppleantRef": f"PA{900000 + index}",
+                }
+            },
+            "chambre": None,
+            "election": {
+                "lieu": {
+                    "region": "Region",
+                    "regionType": "Métropolitain",
+                    "departement": f"Departement {num_departement}",
+                    "numDepartement": num_departement,
+                    "numCirco": num_circo,
+                },
+                "causeMandat": "Élections générales",
+                "refCirconscription": f"PO9{num_departement.zfill(3)}{num_circo.zfill(2)}",
+            },
+            "mandature": {
+                "datePriseFonction": "2024-07-08",
+                "causeFin": None,
+                "premiereElection": "1",
+                "placeHemicycle": str(rng.randrange(1, 650)),
+                "mandatRemplaceRef": None,
+            },
+            "collaborateurs": {
+                "collaborateur": [{"qualite": "M.", "prenom": "A", "nom": "B"}] * 3
+            },
+        },
+        {
+            "@xsi:type": "MandatSimple_Type",
+            "uid": f"PM{850000 + index}",
+            "acteurRef": uid,
+            "legislature": "17",
+            "typeOrgane": "GP",
+            "dateDebut": "2024-07-18",
+            "dateFin": None,
+            "infosQualite": {"codeQualite": "Membre", "libQualite": "Membre"},
+            "organes": {"organeRef": f"PO8{index % groups_count:05d}"},
+            "election": None,
+        },
+    ]
+    mandats += [make_mandat(rng, uid, i) for i in range(OTHER_MANDATS_COUNT)]
+    rng.shuffle(mandats)
+    return {
+        "acteur": {
+            "@xmlns": "http://schemas.assemblee-nationale.fr/referentiel",
+            "@xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+            "uid": {"@xsi:type": "IdActeur_type", "#text": uid},
+            "etatCivil": {
+                "ident": {
+                    "civ": rng.choice(["M.", "Mme"]),
+                    "prenom": f"Prénom{index}",
+                    "nom": f"Nom{index}",
+                    "alpha": f"Nom{index}",
+                    "trigramme": "ABC",
+                },
+                "infoNaissance": {
+                    "dateNais": "1970-01-01",
+                    "villeNais": "Ville",
+                    "depNais": "Departement",
+                    "paysNais": "France",
+                },
+                "dateDeces": None,
+            },
+            "profession": {
+                "libelleCourant": "Profession",
+                "socProcINSEE": {"catSocPro": "Cadres", "famSocPro": "Cadres"},
+            },
+            "uri_hatvp": f"https://www.hatvp.fr/pages_nominatives/nom{index}",
+            "adresses": {
+                "adresse": [
+                    {
+                        "@xsi:type": "AdresseOfficielle_Type",
+                        "uid": f"AD{index}1",
+                        "type": "0",
+                        "typeLibelle": "Adresse officielle",
+                        "poids": "1",
+                        "adresseDeRattachement": None,
+                        "intitule": None,
+                        "numeroRue": "126",
+                        "nomRue": "Rue de l'Université",
+                        "complementAdresse": None,
+                        "codePostal": "75355",
+                        "ville": "Paris 07 SP",
+                    },
+                    {
+                        "@xsi:type": "AdresseMail_Type",
+                        "uid": f"AD{index}2",
+                        "type": "15",
+                        "typeLibelle": "Mèl",
+                        "poids": "1",
+                        "adresseDeRattachement": None,
+                        "valElec": f"prenom{index}.nom{index}@assemblee-nationale.fr",
+                    },
+                    {
+                        "@xsi:type": "AdresseSiteWeb_Type",
+                        "uid": f"AD{index}3",
+                        "type": "22",
+                        "typeLibelle": "Site internet",
+                        "poids": "2",
+                        "adresseDeRattachement": None,
+                        "valElec": f"https://depute{index}.fr",
+                    },
+                ]
+            },
+            "mandats": {"mandat": mandats},
+        }
+    }
+
+
+def make_organe(
+    uid: str, code_type: str, libelle: str, libelle_abrege: str
+) -> Dict[str, Any]:
+    return {
+        "organe": {
+            "@xmlns": "http://schemas.assemblee-nationale.fr/referentiel",
+            "@xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+            "@xsi:type": "OrganeParlementaire_Type",
+            "uid": uid,
+            "codeType": code_type,
+            "libelle": libelle,
+            "libelleEdition": libelle,
+            "libelleAbrege": libelle_abrege,
+            "libelleAbrev": libelle_abrege,
+            "viMoDe": {
+                "dateDebut": "2024-07-08",
+                "dateAgrement": None,
+                "dateFin": None,
+            },
+            "organeParent": None,
+            "chambre": None,
+            "regime": "5ème République",
+            "legislature": "17",
+        }
+    }
+
+
+def make_deputies_documents(scale: float = 1, seed: int = 0) -> Dict[str, Any]:
+    """
+    Builds the documents of a synthetic AMO10 archive.
+
+    Returns:
+        Dict[str, Any]: The documents by member name, e.g. "json/acteur/PA700000.json".
+    """
+    rng = random.Random(seed)
+    count = max(1, int(DEPUTIES_COUNT * scale))
+    documents: Dict[str, Any] = {}
+    for index in range(count):
+        acteur = make_acteur(rng, index, GROUPS_COUNT)
+        uid = acteur["acteur"]["uid"]["#text"]
+        documents[f"json/acteur/{uid}.json"] = acteur
+        for mandat in acteur["acteur"]["mandats"]["mandat"]:
+            election = mandat.get("election")
+            if election:
+                ref = election["refCirconscription"]
+                lieu = election["lieu"]
+                documents[f"json/organe/{ref}.json"] = make_organe(
+                    ref,
+                    "CIRCONSCRIPTION",
+                    f"{lieu['departement']} ({lieu['numCirco']})",
+                    lieu["numCirco"],
+                )
+            elif mandat["typeOrgane"] != "GP":
+                ref = mandat["organes"]["organeRef"]
+                documents[f"json/organe/{ref}.json"] = make_organe(
+                    ref, mandat["typeOrgane"], f"Organe {ref}", ref
+                )
+    for group in range(GROUPS_COUNT):
+        ref = f"PO8{group:05d}"
+        documents[f"json/organe/{ref}.json"] = make_organe(
+            ref, "GP", f"Groupe politique {group}", f"GP{group}"
+        )
+    return documents
+
+
+def write_deputies_zip(path: Path, scale: float = 1, seed: int = 0) -> Path:
+    """Writes a synthetic AMO10 zip archive to path."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, document in make_deputies_documents(scale, seed).items():
+            archive.writestr(name, json.dumps(document, ensure_ascii=False, indent=2))
+    return path
+
+
+# Senators ever recorded in the senat dump at scale 1, and the active ones
+SENATORS_COUNT = 2000
+ACTIVE_SENATORS_COUNT = 348
+# Rows of the tables of the dump not used by the processing, at scale 1
+OTHER_ROWS_COUNT = 50000
+
+SEN_COLUMNS = (
+    "senmat",
+    "quacod",
+    "sennomuse",
+    "senprenomuse",
+    "sennomtec",
+    "etasencod",
+    "sendatnai",
+    "sengrppolcodcou",
+    "sencirnumcou",
+    "senema",
+    "sendespro",
+    "senburlib",
+)
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    text = str(value)
+    return (
+        text.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_block(
+    table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> str:
+    lines = [f"COPY public.{table} ({', '.join(columns)}) FROM stdin;"]
+    lines += ["\t".join(_copy_value(value) for value in row) for row in rows]
+    lines.append("\\.")
+    return "\n".join(lines) + "\n\n"
+
+
+def make_senat_dump(scale: float = 1, seed: int = 0) -> str:
+    """
+    Builds a synthetic export_sens.sql, a pg_dump plain sql file.
+    The sen, grppol and dpt tables are surrounded by other tables
+    that the processing must skip.
+    """
+    rng = random.Random(seed)
+    senators = max(1, int(SENATORS_COUNT * scale))
+    active = max(1, int(ACTIVE_SENATORS_COUNT * scale))
+    groups = [(f"G{index}", f'Groupe {index}\t"été"') for index in range(8)]
+    departements = [
+        (index, f"{index:02d}", f"Département {index}") for index in range(1, 110)
+    ]
+
+    sen_rows = []
+    for index in range(senators):
+        sen_rows.append(
+            (
+                f"{index:05d}X",
+                rng.choice(["M.", "Mme"]),
+                f"Nom{index}",
+                f"Prénom{index}",
+                f"NOM{index}",
+                "ACTIF" if index < active else "ANCIEN",
+                "1960-01-01",
+                rng.choice(groups)[0],
+                rng.choice(departements)[0],
+                f"s.nom{index}@senat.fr" if index % 10 else None,
+                "Profession\nsur deux lignes",
+                None,
+            )
+        )
+    rng.shuffle(sen_rows)
+
+    other_rows = (
+        (index, f"{index % senators:05d}X", "2020-10-01", f"Libellé {index}")
+        for index in range(int(OTHER_ROWS_COUNT * scale))
+    )
+    return "".join(
+        [
+            "--\n-- PostgreSQL database dump\n--\n\n",
+            "SET statement_timeout = 0;\nSET client_encoding = 'UTF8';\n\n",
+            "CREATE TABLE public.sen (\n    senmat character varying(6) NOT NULL\n);\n\n",
+            _copy_block("elusen", ("eluid", "senmat", "datdeb", "lib"), other_rows),
+            _copy_block("sen", SEN_COLUMNS, sen_rows),
+            _copy_block("dpt", ("dptnum", "dptcod", "dptlib"), departements),
+            _copy_block("grppol", ("grppolcod", "grppollilcou"), groups),
+            "--\n-- PostgreSQL database dump complete\n--\n",
+        ]
+    )
+
+
+def write_senat_zip(path: Path, scale: float = 1, seed: int = 0) -> Path:
+    """Writes a synthetic export_sens.zip containing export_sens.sql to path."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("export_sens.sql", make_senat_dump(scale, seed))
+    return path
+
+
+# Members of the european parliament at scale 1
+MEPS_COUNT = 720
+
+EUROPARL_COLUMNS = (
+    "mep_identifier",
+    "mep_honorific_prefix",
+    "mep_given_name",
+    "mep_family_name",
+    "mep_sort_label",
+    "mep_country_of_representation",
+    "mep_political_group",
+    "mep_local_party",
+    "mep_email",
+    "mep_homepage",
+    "mep_birth_date",
+    "mep_birth_place",
+)
+
+EUROPARL_GROUPS = (
+    "Groupe du Parti populaire européen (Démocrates-Chrétiens)",
+    "Groupe de l'Alliance Progressiste des Socialistes et Démocrates au Parlement européen",
+    "Groupe Renew Europe",
+    'Groupe des Verts/Alliance libre européenne, dit "Verts/ALE"',
+    "Groupe des Conservateurs et Réformistes européens",
+    "Non-inscrits",
+)
+
+
+def make_europarl_csv(scale: float = 1, seed: int = 0) -> str:
+    """
+    Builds a synthetic members of the european parliament csv file.
+    Some fields are quoted, with commas, quotes and newlines inside.
+    """
+    rng = random.Random(seed)
+    count = max(1, int(MEPS_COUNT * scale))
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(EUROPARL_COLUMNS)
+    for index in range(count):
+        writer.writerow(
+            (
+                str(100000 + index),
+                rng.choice(["M.", "Mme"]),
+                f"Prénom{index}",
+                f'Nom{index}, dit "N{index}"' if index % 50 == 0 else f"Nom{index}",
+                f"NOM{index} Prénom{index}",
+                rng.choice(["France", "Deutschland", "España", "Italia", "Polska"]),
+                rng.choice(EUROPARL_GROUPS),
+                f"Parti {index % 40}\nListe commune" if index % 30 == 0 else "",
+                f"prenom.nom{index}@europarl.europa.eu" if index % 20 else "",
+                f"https://www.europarl.europa.eu/meps/fr/{100000 + index}",
+                "1970-01-01",
+                "Ville",
+            )
+        )
+    return output.getvalue()
+
+
+def write_europarl_csv(path: Path, scale: float = 1, seed: int = 0) -> Path:
+    """Writes a synthetic members of the european parliament csv file to path."""
+    path.write_text(make_europarl_csv(scale, seed), encoding="utf-8")
+    return path
+
+
+def iter_elected_values(count: int, seed: int = 0) -> Iterator[Dict[str, str]]:
+    """
+    Yields the fields of count members, with accents and quotes like the real output.
+    Each value is a new string, like the values read from the upstream files.
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        departement = index % 95 + 1
+        circonscription = index % 12 + 1
+        group = index % GROUPS_COUNT
+        yield {
+            "ref": f"PA{100000 + index}",
+            "civ": rng.choice(["M.", "Mme"]),
+            "last_name": f"Nom{index}",
+            "first_name": f"Prénom{index}",
+            "email": f"prenom.nom{index}@assemblee-nationale.fr",
+            "departement_num": f"{departement:02d}",
+            "departement_name": f"Département {departement}",
+            "circonscription_num": f"{circonscription:02d}",
+            "circonscription_name": f"{circonscription}ème circonscription",
+            "circonscription_code": f"{departement:02d}{circonscription:02d}-{index}",
+            "country": "".join(["Fra", "nce"]),
+            "group_abv": f"G{group}",
+            "group_name": f'Groupe "{group}" de l\'Assemblée',
+        }
+
+
+def make_elected(count: int, seed: int = 0) -> List[Elected]:
+    """Builds count Elected records from iter_elected_values."""
+    return [Elected(**values) for values in iter_elected_values(count, seed)]
@@ -0,0 +1,101 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Compare the parse time and the peak memory of each json backend
+on a synthetic AMO10 corpus.
+
+Usage: python -m benchmark.json_backends [--scale 1] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, List, Tuple
+
+from benchmark.fixtures import make_deputies_documents
+from download.jsonbackend import JsonDecoder, available_backends
+from process.schema import ACTEUR_SCHEMA, ORGANE_SCHEMA, trim_acteur, trim_organe
+
+
+def decode_all(
+    decoders: Tuple[JsonDecoder, JsonDecoder], corpus: List[Tuple[bool, bytes]]
+) -> List[Any]:
+    acteur_decoder, organe_decoder = decoders
+    return [
+        acteur_decoder(content) if is_acteur else organe_decoder(content)
+        for is_acteur, content in corpus
+    ]
+
+
+def run(
+    name: str,
+    decoders: Tuple[JsonDecoder, JsonDecoder],
+    corpus: List[Tuple[bool, bytes]],
+    repeat: int,
+) -> None:
+    durations: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode_all(decoders, corpus)
+        durations.append(time.perf_counter() - start)
+
+    # Peak memory while every decoded document is kept, as the processing does
+    tracemalloc.start()
+    documents = decode_all(decoders, corpus)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del documents
+
+    print(
+        f"{name:<24} best {min(durations) * 1000:8.1f} ms  "
+        f"peak memory {peak / 1024 / 1024:7.1f} MB"
+    )
+
+
+def main(scale: float, repeat: int) -> None:
+    documents = make_deputies_documents(scale)
+    corpus: List[Tuple[bool, bytes]] = [
+        (name.startswith("json/acteur/"), json.dumps(document).encode())
+        for name, document in documents.items()
+    ]
+    size = sum(len(content) for _, content in corpus)
+    print(f"{len(corpus)} documents, {size / 1024 / 1024:.1f} MB")
+
+    for backend in available_backends():
+        run(
+            f"{backend}",
+            (JsonDecoder(backend), JsonDecoder(backend)),
+            corpus,
+            repeat,
+        )
+        run(
+            f"{backend} + trim",
+            (
+                JsonDecoder(backend, trim=trim_acteur),
+                JsonDecoder(backend, trim=trim_organe),
+            ),
+            corpus,
+            repeat,
+        )
+    if "msgspec" in available_backends():
+        run(
+            "msgspec typed + trim",
+            (
+                JsonDecoder("msgspec", ACTEUR_SCHEMA, trim_acteur),
+                JsonDecoder("msgspec", ORGANE_SCHEMA, trim_organe),
+            ),
+            corpus,
+            repeat,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.scale, args.repeat)
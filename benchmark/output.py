@@ -0,0 +1,107 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Compare the former yaml.dump of the whole output document
+with the streaming OutputWriter in each format, on synthetic Elected records.
+
+Usage: python -m benchmark.output [--count 10000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiofiles
+import yaml
+
+import benchmark
+from benchmark.download import measure_loop_lag
+from benchmark.fixtures import make_elected
+from process.core import Elected
+from process.output import FORMATS, YAML_DUMPER, OutputWriter, state_path
+
+
+async def legacy_write(elected: List[Elected]) -> None:
+    """The output before the streaming writer: the whole document dumped on the event loop."""
+    members: Dict[str, Any] = {member.ref: member.to_dict() for member in elected}
+    output: Dict[str, Any] = {
+        "metadata": {
+            "last_updated": datetime.now().isoformat(),
+            "count": len(members),
+        },
+        "members": members,
+    }
+    file_path = Path(benchmark.BENCHMARK_FOLDER) / "legacy.yaml"
+    async with aiofiles.open(file_path, mode="w+", encoding="utf-8") as f:
+        await f.write(yaml.dump(output))
+        await f.flush()
+
+
+def streaming_write(output_format: str) -> Callable[[List[Elected]], Awaitable[None]]:
+    async def write(elected: List[Elected]) -> None:
+        # Forget the previous run, so that every run publishes its files
+        state_path(f"streaming_{output_format}").unlink(missing_ok=True)
+        async with OutputWriter(
+            f"streaming_{output_format}", [output_format]
+        ) as writer:
+            for member in elected:
+                await writer.write(await writer.serialize([(member.ref, member)]))
+
+    return write
+
+
+async def run(
+    name: str,
+    write: Callable[[List[Elected]], Awaitable[None]],
+    elected: List[Elected],
+    repeat: int,
+) -> None:
+    durations: List[float] = []
+    lags: List[float] = []
+    for _ in range(repeat):
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop, lags))
+        start = time.perf_counter()
+        await write(elected)
+        durations.append(time.perf_counter() - start)
+        stop.set()
+        await lag_task
+
+    tracemalloc.start()
+    await write(elected)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<24} best {min(durations) * 1000:8.1f} ms  "
+        f"peak memory {peak / 1024 / 1024:6.1f} MB  "
+        f"max loop lag {max(lags) * 1000:7.1f} ms"
+    )
+
+
+async def main(count: int, repeat: int) -> None:
+    elected = make_elected(count)
+    print(f"{count} members, yaml dumper {YAML_DUMPER.__name__}")
+    await run("yaml.dump (legacy)", legacy_write, elected, repeat)
+    for output_format in FORMATS:
+        await run(
+            f"streaming {output_format}",
+            streaming_write(output_format),
+            elected,
+            repeat,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.count, args.repeat))
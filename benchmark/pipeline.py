@@ -0,0 +1,255 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Time each update pipeline end to end and per stage, on synthetic upstream files
+served by a local stand-in server, and compare the times with a stored baseline.
+
+Usage: python -m benchmark.pipeline [--scale 1] [--repeat 3] [--bandwidth-mbps 0] [--latency-ms 0]
+    [--baseline benchmark/baseline.json] [--save-baseline] [--tolerance 0.2]
+
+Exits with status 1 when a time is slower than the baseline by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import benchmark
+from benchmark.fixtures import (
+    make_europarl_csv,
+    write_deputies_zip,
+    write_senat_zip,
+)
+from benchmark.server import serve_in_thread
+from common.metrics import UpdateReport, record_update
+from download.core import Downloader, shutdown_parse_executor
+from download.update import (
+    run_chamber,
+    update_deputes,
+    update_europarl,
+    update_senat,
+)
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Times shorter than this are left out of the comparison, as they are mostly noise
+MIN_COMPARED_SECONDS = 0.05
+
+# Updates a chamber from the url of its upstream file, in a temporary folder
+ChamberRun = Callable[[Downloader, str, Path], Awaitable[None]]
+
+PIPELINES: Dict[str, Tuple[str, ChamberRun]] = {
+    "deputes": (
+        "/deputes.zip",
+        lambda downloader, url, temp: update_deputes(downloader, temp, url),
+    ),
+    "senat": (
+        "/senat.zip",
+        lambda downloader, url, temp: update_senat(downloader, temp, temp, url),
+    ),
+    "europarl": (
+        "/europarl.csv",
+        lambda downloader, url, temp: update_europarl(downloader, temp, url),
+    ),
+}
+
+
+def make_files(scale: float) -> Dict[str, bytes]:
+    """The synthetic upstream files served for each pipeline."""
+    with tempfile.TemporaryDirectory() as folder:
+        return {
+            PIPELINES["deputes"][0]: write_deputies_zip(
+                Path(folder) / "deputes.zip", scale
+            ).read_bytes(),
+            PIPELINES["senat"][0]: write_senat_zip(
+                Path(folder) / "senat.zip", scale
+            ).read_bytes(),
+            PIPELINES["europarl"][0]: make_europarl_csv(scale).encode(),
+        }
+
+
+def clear_output() -> None:
+    """Removes the outputs of the previous run, so that every run publishes its files."""
+    for path in Path(benchmark.BENCHMARK_FOLDER).iterdir():
+        if path.is_dir():
+            shutil.rmtree(path)
+        elif path.suffix != ".log":
+            path.unlink()
+
+
+async def run_pipeline(
+    name: str, downloader: Downloader, url: str, repeat: int
+) -> Dict[str, Any]:
+    """
+    Runs the pipeline repeat times, one chamber at a time.
+
+    Returns:
+        Dict[str, Any]: The best total time and the best time of each stage, in second,
+            and the peak memory of the process.
+    """
+    _, run = PIPELINES[name]
+    totals: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    peak_rss: Optional[int] = None
+    for _ in range(repeat):
+        clear_output()
+        with (
+            tempfile.TemporaryDirectory() as temp,
+            record_update(UpdateReport()) as report,
+        ):
+            result = await run_chamber(
+                name, lambda: run(downloader, url, Path(temp)), asyncio.Semaphore(1)
+            )
+        if not result.success:
+            raise RuntimeError(f"The {name} pipeline failed: {result.error}")
+        totals.append(result.duration)
+        for metrics in report.chambers[name].stages.values():
+            stages.setdefault(metrics.name, []).append(metrics.wall_seconds)
+            peak_rss = max(peak_rss or 0, metrics.peak_rss_bytes or 0) or None
+    return {
+        "total": min(totals),
+        "stages": {stage: min(durations) for stage, durations in stages.items()},
+        "peak_rss_bytes": peak_rss,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], results: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """
+    Prints the times next to the baseline ones.
+
+    Returns:
+        List[str]: The times slower than the baseline by more than tolerance.
+    """
+    regressions: List[str] = []
+    print(f"{'':<28} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name, {"total": None, "stages": {}})
+        rows = [(name, previous["total"], result["total"])] + [
+            (f"  {stage}", previous["stages"].get(stage), duration)
+            for stage, duration in result["stages"].items()
+        ]
+        for label, before, after in rows:
+            if before is None:
+                print(f"{label:<28} {'-':>10} {after:10.3f}")
+                continue
+            change = after / before - 1 if before else 0.0
+            regressed = (
+                max(before, after) >= MIN_COMPARED_SECONDS and change > tolerance
+            )
+            print(
+                f"{label:<28} {before:10.3f} {after:10.3f} {change:+8.1%}"
+                + ("  REGRESSION" if regressed else "")
+            )
+            if regressed:
+                stage = "total" if label == name else label.strip()
+                regressions.append(f"{name} {stage} {change:+.1%}")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    parameters = {
+        "scale": args.scale,
+        "bandwidth_mbps": args.bandwidth_mbps,
+        "latency_ms": args.latency_ms,
+    }
+    baseline: Optional[Dict[str, Any]] = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["parameters"] != parameters:
+            print(
+                f"The baseline was recorded with {baseline['parameters']}, not {parameters}"
+            )
+            return 2
+
+    files = make_files(args.scale)
+    bandwidth = args.bandwidth_mbps * 1024 * 1024 if args.bandwidth_mbps else None
+    results: Dict[str, Any] = {}
+    with serve_in_thread(
+        files, bandwidth=bandwidth, latency=args.latency_ms / 1000
+    ) as server:
+        # No download cache: every run downloads and processes its file
+        async with Downloader() as downloader:
+            for name in args.pipelines:
+                path, _ = PIPELINES[name]
+                print(f"{name}: {len(files[path]) / 1024 / 1024:.1f} MB", flush=True)
+                results[name] = await run_pipeline(
+                    name, downloader, server.url(path), args.repeat
+                )
+    shutdown_parse_executor()
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "parameters": parameters,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n"
+        )
+        print(f"Baseline saved to {args.baseline}")
+        compare({}, results, args.tolerance)
+        return 0
+
+    if baseline is None:
+        compare({}, results, args.tolerance)
+        print(f"No baseline at {args.baseline}, save one with --save-baseline")
+        return 0
+
+    regressions = compare(baseline["results"], results, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("No regression")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scale", type=float, default=1, help="1 is about the size of the real files"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--bandwidth-mbps",
+        type=float,
+        default=0,
+        help="MiB per second sent by the server, 0 is unlimited",
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0, help="delay before each response"
+    )
+    parser.add_argument(
+        "--pipelines",
+        nargs="+",
+        choices=list(PIPELINES),
+        default=list(PIPELINES),
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the times as the new baseline instead of comparing them",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="slowdown allowed before failing, 0.2 is 20%%",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
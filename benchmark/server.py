@@ -0,0 +1,118 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from aiohttp import web
+
+# Time between two writes of a throttled response in second
+SEND_INTERVAL = 0.01
+
+
+class StandInServer:
+    """
+    Local HTTP server standing in for the upstream open data servers.
+    Serves in-memory files, use it as an async context manager.
+
+    Parameters:
+        files (Dict[str, bytes]): The content of each served path, e.g. {"/file.zip": b"..."}.
+        host (str): The host to listen on.
+        port (int): The port to listen on, 0 picks a free port.
+        bandwidth (Optional[float]): The bytes sent per second by each response, None is unlimited.
+        latency (float): The delay before each response in second.
+    """
+
+    def __init__(
+        self,
+        files: Dict[str, bytes],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        bandwidth: Optional[float] = None,
+        latency: float = 0,
+    ) -> None:
+        self.files = files
+        self.host = host
+        self.port = port
+        self.bandwidth = bandwidth
+        self.latency = latency
+        self._runner: Optional[web.AppRunner] = None
+
+    def url(self, path: str) -> str:
+        return f"http://{self.host}:{self.port}{path}"
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        content = self.files.get(request.path)
+        if content is None:
+            raise web.HTTPNotFound()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.bandwidth is None:
+            return web.Response(body=content)
+
+        response = web.StreamResponse()
+        response.content_length = len(content)
+        await response.prepare(request)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        chunk_size = max(1, int(self.bandwidth * SEND_INTERVAL))
+        for offset in range(0, len(content), chunk_size):
+            await response.write(content[offset : offset + chunk_size])
+            # Wait until the bytes sent so far are due at the given bandwidth
+            delay = start + (offset + chunk_size) / self.bandwidth - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await response.write_eof()
+        return response
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> StandInServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+
+@contextmanager
+def serve_in_thread(
+    files: Dict[str, bytes],
+    host: str = "127.0.0.1",
+    port: int = 0,
+    bandwidth: Optional[float] = None,
+    latency: float = 0,
+) -> Iterator[StandInServer]:
+    """
+    Run a StandInServer on its own event loop in a background thread,
+    so that serving the files does not compete with the measured event loop.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = StandInServer(files, host, port, bandwidth, latency)
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -49,7 +49,124 @@ UPDATE_PROGRESS_SECOND = int(
     __load_env("UPDATE_DOWNLOAD_PROGRESS_SECOND", "2")
 )  # Download progress update in second, if 0 is disabled
 
+DOWNLOAD_LIMIT_PER_HOST = int(
+    __load_env("DOWNLOAD_LIMIT_PER_HOST", "4")
+)  # Maximum number of pooled connections per host, 0 is unlimited
+DOWNLOAD_TIMEOUT = float(
+    __load_env("DOWNLOAD_TIMEOUT", "600")
+)  # Total timeout of a download in second
+DOWNLOAD_CONNECT_TIMEOUT = float(
+    __load_env("DOWNLOAD_CONNECT_TIMEOUT", "30")
+)  # Timeout to acquire a connection in second
+DOWNLOAD_DNS_CACHE_TTL = int(
+    __load_env("DOWNLOAD_DNS_CACHE_TTL", "600")
+)  # Time to keep resolved host names in second
+DOWNLOAD_KEEPALIVE_TIMEOUT = float(
+    __load_env("DOWNLOAD_KEEPALIVE_TIMEOUT", "60")
+)  # Time to keep an idle pooled connection open in second
+
+DOWNLOAD_CHUNK_SIZE = int(
+    __load_env("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024))
+)  # Size of the blocks written to disk during a download in bytes
+
+DOWNLOAD_RETRIES = int(
+    __load_env("DOWNLOAD_RETRIES", "3")
+)  # Number of retries of an interrupted download, resumed when the server allows it
+DOWNLOAD_RETRY_BACKOFF = float(
+    __load_env("DOWNLOAD_RETRY_BACKOFF", "1")
+)  # Delay before the first retry in second, doubled at each retry
+
+UPDATE_CONCURRENCY = int(
+    __load_env("UPDATE_CONCURRENCY", "3")
+)  # Number of chambers updated at the same time, 1 runs them one after another
+
+PARSE_WORKERS = int(
+    __load_env("PARSE_WORKERS", "0")
+)  # Number of processes parsing the json files, 0 uses every cpu, 1 parses in a thread
+PARSE_BATCH_SIZE = int(
+    __load_env("PARSE_BATCH_SIZE", "64")
+)  # Number of json files parsed by each task of the parse pool
+
+CSV_CHUNK_SIZE = int(
+    __load_env("CSV_CHUNK_SIZE", str(256 * 1024))
+)  # Number of characters read at once from a csv file
+
+JSON_BACKEND = __load_env(
+    "JSON_BACKEND", "auto"
+).lower()  # Json decoder (auto, msgspec, orjson, json), auto picks the fastest installed
+
 OUTPUT_FOLDER = Path(__load_env_required("OUTPUT_FOLDER"))  # Path to "data" folder
+OUTPUT_FORMATS = [
+    output_format.strip().lower()
+    for output_format in __load_env("OUTPUT_FORMATS", "yaml").split(",")
+    if output_format.strip()
+]  # Formats of the output files, comma separated (yaml, json, ndjson)
+OUTPUT_COLUMNAR_FORMATS = [
+    columnar_format.strip().lower()
+    for columnar_format in __load_env("OUTPUT_COLUMNAR_FORMATS", "").split(",")
+    if columnar_format.strip()
+]  # Columnar files written along the output files, comma separated (parquet, arrow), needs pyarrow
+OUTPUT_CHANGESET = bool(
+    int(__load_env("OUTPUT_CHANGESET", "1"))
+)  # Write the added, removed and modified members since the previous output to <name>.changes.json
+OUTPUT_INDEX_ENABLED = bool(
+    int(__load_env("OUTPUT_INDEX_ENABLED", "1"))
+)  # Build the sqlite index of the members of every chamber after an update
+OUTPUT_INDEX_PATH = Path(
+    __load_env("OUTPUT_INDEX_PATH", str(OUTPUT_FOLDER / "elected.sqlite"))
+)  # Path to the sqlite index of the members
+OUTPUT_BATCH_SIZE = int(
+    __load_env("OUTPUT_BATCH_SIZE", "256")
+)  # Number of members serialized at once before being written
+PIPELINE_QUEUE_SIZE = int(
+    __load_env("PIPELINE_QUEUE_SIZE", "2")
+)  # Number of batches waiting between two stages of the processing, bounds the memory used
+PIPELINE_BUILD_WORKERS = int(
+    __load_env("PIPELINE_BUILD_WORKERS", "1")
+)  # Number of batches of members built at the same time, in threads when more than 1
+
+DOWNLOAD_CACHE_ENABLED = bool(
+    int(__load_env("DOWNLOAD_CACHE_ENABLED", "1"))
+)  # Skip the chambers whose upstream file did not change, 0 always updates
+DOWNLOAD_CACHE_PATH = Path(
+    __load_env("DOWNLOAD_CACHE_PATH", str(OUTPUT_FOLDER / ".download_cache.json"))
+)  # Path to the file keeping the ETag, Last-Modified and hash of each download
+
+UPDATE_LOCK_PATH = Path(
+    __load_env("UPDATE_LOCK_PATH", str(OUTPUT_FOLDER / ".update.lock"))
+)  # Lock file held during an update, so that two updates never run at the same time
+
+REPORT_PATH = Path(
+    __load_env("REPORT_PATH", str(OUTPUT_FOLDER / "update_report.json"))
+)  # Json report of the last update: time, cpu, bytes, records and memory of each stage
+REPORT_PROMETHEUS_PATH = __load_env(
+    "REPORT_PROMETHEUS_PATH", ""
+)  # Prometheus textfile of the report (e.g. in the node exporter textfile folder), empty is disabled
+
+# Daemon mode (main.py --daemon), each chamber is refreshed on its own interval
+DAEMON_INTERVAL_DEPUTES = float(
+    __load_env("DAEMON_INTERVAL_DEPUTES", "3600")
+)  # Time between two updates of the deputes in second
+DAEMON_INTERVAL_SENAT = float(
+    __load_env("DAEMON_INTERVAL_SENAT", "21600")
+)  # Time between two updates of the senat in second
+DAEMON_INTERVAL_EUROPARL = float(
+    __load_env("DAEMON_INTERVAL_EUROPARL", "21600")
+)  # Time between two updates of the europarl in second
+DAEMON_JITTER = float(
+    __load_env("DAEMON_JITTER", "0.1")
+)  # Random part of each delay, 0.1 waits between 90% and 110% of it
+DAEMON_RETRY_BACKOFF = float(
+    __load_env("DAEMON_RETRY_BACKOFF", "60")
+)  # Delay before retrying a failed chamber in second, doubled at each failure up to its interval
+
+
+# How the senat dump is read: dump parses it directly, postgres loads it with psql
+# in a new database, staging loads it with COPY in a persistent schema of POSTGRES_DATABASE
+SENAT_LOADER = __load_env("SENAT_LOADER", "dump").lower()
+SENAT_STAGING_SCHEMA = __load_env(
+    "SENAT_STAGING_SCHEMA", "senat_staging"
+)  # Schema kept between runs by the staging loader
 
 
 # postgres options for the senat export
@@ -68,6 +185,16 @@ POSTGRES_OPTIONS = PostgresOptions(
     host=__load_env("POSTGRES_HOST", "localhost"),
 )
 
+POSTGRES_POOL_MIN_SIZE = int(
+    __load_env("POSTGRES_POOL_MIN_SIZE", "1")
+)  # Connections opened when the postgres pool is created
+POSTGRES_POOL_MAX_SIZE = int(
+    __load_env("POSTGRES_POOL_MAX_SIZE", "4")
+)  # Maximum number of connections of the postgres pool
+POSTGRES_CURSOR_PREFETCH = int(
+    __load_env("POSTGRES_CURSOR_PREFETCH", "100")
+)  # Rows fetched at once from the server-side cursor of the senat query
+
 # Logs
 LOG_PATH = __load_env("LOG_PATH", "interpelmail_update.log")  # Path to the log file
 LOG_LEVEL = __load_env("LOG_LEVEL", "INFO").upper()  # Logging level (INFO, DEBUG...)
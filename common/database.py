@@ -0,0 +1,83 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import asyncio
+from typing import Optional, Union
+
+import asyncpg
+from asyncpg.pool import PoolConnectionProxy
+
+from common.config import (
+    POSTGRES_OPTIONS,
+    POSTGRES_POOL_MAX_SIZE,
+    POSTGRES_POOL_MIN_SIZE,
+)
+from common.logger import logger
+
+# A connection opened directly, or acquired from the pool
+Connection = Union[asyncpg.Connection, PoolConnectionProxy]
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def connect_maintenance() -> asyncpg.Connection:
+    """Connects to the postgres maintenance database, to create or drop databases."""
+    return await asyncpg.connect(
+        database="postgres",
+        user=POSTGRES_OPTIONS.user,
+        password=POSTGRES_OPTIONS.password,
+        host=POSTGRES_OPTIONS.host,
+    )
+
+
+async def get_pool() -> asyncpg.Pool:
+    """
+    Returns the connection pool to POSTGRES_DATABASE, created on first use,
+    along with the database if it does not exist.
+    The pool is kept between updates, so that a long running process
+    reuses its connections and their prepared statements.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = await _create_pool()
+            except asyncpg.InvalidCatalogNameError:
+                logger.info("Creating database %s", POSTGRES_OPTIONS.database)
+                conn = await connect_maintenance()
+                try:
+                    await conn.execute(f"CREATE DATABASE {POSTGRES_OPTIONS.database}")
+                finally:
+                    await conn.close()
+                _pool = await _create_pool()
+        return _pool
+
+
+async def _create_pool() -> asyncpg.Pool:
+    pool = await asyncpg.create_pool(
+        database=POSTGRES_OPTIONS.database,
+        user=POSTGRES_OPTIONS.user,
+        password=POSTGRES_OPTIONS.password,
+        host=POSTGRES_OPTIONS.host,
+        min_size=min(POSTGRES_POOL_MIN_SIZE, POSTGRES_POOL_MAX_SIZE),
+        max_size=POSTGRES_POOL_MAX_SIZE,
+    )
+    logger.debug(
+        "Postgres pool to %s created (%d-%d connections)",
+        POSTGRES_OPTIONS.database,
+        POSTGRES_POOL_MIN_SIZE,
+        POSTGRES_POOL_MAX_SIZE,
+    )
+    return pool
+
+
+async def close_pool() -> None:
+    """Closes the connection pool if it was created."""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
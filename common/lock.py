@@ -0,0 +1,79 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import IO, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+
+class LockedError(Exception):
+    """Exception raised when the lock is held by another process."""
+
+
+class FileLock:
+    """
+    Exclusive lock on a file, held by one process at a time and released by the system
+    when the process exits, even if it crashed.
+
+    Parameters:
+        path (Path): The lock file, created if missing.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: Optional[IO[str]] = None
+
+    def acquire(self) -> None:
+        """
+        Takes the lock without waiting.
+
+        Raises:
+            LockedError: The lock is held by another process.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.seek(0)
+            owner = f.read().strip()
+            f.close()
+            raise LockedError(
+                f"{self.path} is locked" + (f" by the process {owner}" if owner else "")
+            )
+        # The pid of the owner, for the message of the processes waiting for it
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
@@ -0,0 +1,286 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Measures of the stages of an update: wall and cpu time, bytes read and written,
+records and peak memory, gathered per chamber in the report of the run.
+The report and the chamber being updated are held in context variables,
+so the stages are recorded wherever they run without passing the report around,
+including in the threads started with asyncio.to_thread.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sized,
+    Tuple,
+    TypeVar,
+)
+
+from attrs import asdict, define, field
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+# Prefix of the Prometheus metrics
+METRICS_PREFIX = "elected_update"
+
+
+def peak_rss() -> Optional[int]:
+    """The peak resident memory of the process so far in bytes, None when unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@define
+class StageMetrics:
+    """
+    Measures of a stage, summed over every time it ran during the update of a chamber.
+    The cpu time is the one of the whole process, so it includes the chambers updated at the same time,
+    but not the parse pool processes. The peak memory is the one of the process when the stage ended.
+    The times of the items a stage handles at the same time add up, so its wall time can exceed the update's.
+    """
+
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    records: int = 0
+    peak_rss_bytes: Optional[int] = None
+
+
+@define
+class ChamberReport:
+    """The stages of the last update of a chamber and its outcome."""
+
+    name: str
+    stages: Dict[str, StageMetrics] = field(factory=dict)
+    success: Optional[bool] = None
+    changed: Optional[bool] = None
+    duration: float = 0.0
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+
+
+@define
+class UpdateReport:
+    """The report of an update, the stages outside of a chamber (e.g. the index) are kept apart."""
+
+    started_at: float = field(factory=time.time)
+    chambers: Dict[str, ChamberReport] = field(factory=dict)
+    stages: Dict[str, StageMetrics] = field(factory=dict)
+
+
+_report: ContextVar[Optional[UpdateReport]] = ContextVar("report", default=None)
+_chamber: ContextVar[Optional[ChamberReport]] = ContextVar("chamber", default=None)
+
+
+@contextmanager
+def record_update(report: UpdateReport) -> Iterator[UpdateReport]:
+    """Records the stages run inside the block, and in the tasks it starts, in report."""
+    token = _report.set(report)
+    try:
+        yield report
+    finally:
+        _report.reset(token)
+
+
+@contextmanager
+def record_chamber(name: str) -> Iterator[Optional[ChamberReport]]:
+    """
+    Records the stages run inside the block in a new report of the chamber,
+    replacing the one of its previous update. Yields None when no update is recorded.
+    """
+    report = _report.get()
+    if report is None:
+        yield None
+        return
+    chamber = ChamberReport(name)
+    report.chambers[name] = chamber
+    token = _chamber.set(chamber)
+    try:
+        yield chamber
+    finally:
+        chamber.finished_at = time.time()
+        _chamber.reset(token)
+
+
+def set_changed(changed: bool) -> None:
+    """Records whether the upstream data of the chamber being updated changed."""
+    chamber = _chamber.get()
+    if chamber is not None:
+        chamber.changed = changed
+
+
+def stage_metrics(name: str) -> StageMetrics:
+    """
+    The metrics of the stage name of the current chamber, or of the update outside of a chamber,
+    e.g. to count bytes read once for a stage run many times. Not kept when no update is recorded.
+    """
+    chamber = _chamber.get()
+    report = _report.get()
+    stages = (
+        chamber.stages
+        if chamber is not None
+        else report.stages if report is not None else {}
+    )
+    return stages.setdefault(name, StageMetrics(name))
+
+
+@contextmanager
+def stage(name: str) -> Iterator[StageMetrics]:
+    """
+    Measures the block as the stage name of the current chamber, or of the update outside of a chamber.
+    The yielded metrics take the bytes and records counted by the block.
+    Nothing is kept when no update is recorded.
+    """
+    metrics = stage_metrics(name)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield metrics
+    finally:
+        metrics.calls += 1
+        metrics.wall_seconds += time.perf_counter() - wall
+        metrics.cpu_seconds += time.process_time() - cpu
+        metrics.peak_rss_bytes = peak_rss()
+
+
+async def timed_iter(
+    name: str, iterable: AsyncIterable[T], bytes_in: int = 0
+) -> AsyncIterator[T]:
+    """
+    Yields the items of iterable, measuring the time taken to produce them as the stage name.
+    The length of the items is counted as records, e.g. for batches.
+
+    Parameters:
+        name (str): The name of the stage.
+        iterable (AsyncIterable[T]): The items, produced lazily.
+        bytes_in (int): The size of the source of the items, e.g. the file they are read from.
+    """
+    iterator = aiter(iterable)
+    while True:
+        with stage(name) as metrics:
+            metrics.bytes_in += bytes_in
+            bytes_in = 0
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            if isinstance(item, Sized):
+                metrics.records += len(item)
+        yield item
+
+
+def report_json(report: UpdateReport) -> str:
+    """The report as indented json."""
+    return json.dumps(asdict(report), indent=2, sort_keys=True) + "\n"
+
+
+def _metric_lines(
+    name: str, help_text: str, samples: List[Tuple[Dict[str, str], Any]]
+) -> List[str]:
+    lines = [
+        f"# HELP {METRICS_PREFIX}_{name} {help_text}",
+        f"# TYPE {METRICS_PREFIX}_{name} gauge",
+    ]
+    for labels, value in samples:
+        if value is None:
+            continue
+        label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+        lines.append(
+            f"{METRICS_PREFIX}_{name}{{{label_text}}} {float(value)}"
+            if label_text
+            else f"{METRICS_PREFIX}_{name} {float(value)}"
+        )
+    return lines
+
+
+# Metrics of each stage: name, attribute of StageMetrics, help
+STAGE_METRICS = (
+    ("stage_calls", "calls", "Number of times the stage ran"),
+    ("stage_wall_seconds", "wall_seconds", "Wall time of the stage"),
+    ("stage_cpu_seconds", "cpu_seconds", "Cpu time of the process during the stage"),
+    ("stage_bytes_in", "bytes_in", "Bytes read by the stage"),
+    ("stage_bytes_out", "bytes_out", "Bytes written by the stage"),
+    ("stage_records", "records", "Records handled by the stage"),
+    (
+        "stage_peak_rss_bytes",
+        "peak_rss_bytes",
+        "Peak resident memory of the process at the end of the stage",
+    ),
+)
+
+
+def report_prometheus(report: UpdateReport) -> str:
+    """The report in the Prometheus text format, for the textfile collector of the node exporter."""
+    stages = [
+        ({"chamber": chamber.name, "stage": metrics.name}, metrics)
+        for chamber in report.chambers.values()
+        for metrics in chamber.stages.values()
+    ] + [
+        ({"chamber": "", "stage": metrics.name}, metrics)
+        for metrics in report.stages.values()
+    ]
+    chambers = list(report.chambers.values())
+
+    lines = _metric_lines(
+        "started_timestamp_seconds",
+        "Start of the update",
+        [({}, report.started_at)],
+    )
+    for name, attribute, help_text in STAGE_METRICS:
+        lines += _metric_lines(
+            name,
+            help_text,
+            [(labels, getattr(metrics, attribute)) for labels, metrics in stages],
+        )
+    lines += _metric_lines(
+        "chamber_success",
+        "Whether the last update of the chamber succeeded",
+        [
+            ({"chamber": chamber.name}, chamber.success)
+            for chamber in chambers
+            if chamber.success is not None
+        ],
+    )
+    lines += _metric_lines(
+        "chamber_changed",
+        "Whether the upstream data of the chamber changed in its last update",
+        [
+            ({"chamber": chamber.name}, chamber.changed)
+            for chamber in chambers
+            if chamber.changed is not None
+        ],
+    )
+    lines += _metric_lines(
+        "chamber_duration_seconds",
+        "Duration of the last update of the chamber",
+        [({"chamber": chamber.name}, chamber.duration) for chamber in chambers],
+    )
+    lines += _metric_lines(
+        "chamber_finished_timestamp_seconds",
+        "End of the last update of the chamber",
+        [({"chamber": chamber.name}, chamber.finished_at) for chamber in chambers],
+    )
+    return "\n".join(lines) + "\n"
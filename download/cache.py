@@ -0,0 +1,81 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from attrs import asdict, define
+
+from common.logger import logger
+
+
+@define
+class CacheEntry:
+    """Validators and content hash of the last processed download of an url."""
+
+    etag: str = ""
+    last_modified: str = ""
+    sha256: str = ""
+
+
+@define
+class DownloadResult:
+    """
+    Outcome of a download.
+    changed is False when the server answered 304 Not Modified,
+    or when the downloaded content has the same hash as the cached one.
+    """
+
+    url: str
+    changed: bool
+    entry: CacheEntry
+
+
+class DownloadCache:
+    """
+    Persistent cache of the downloads, stored as a json file.
+
+    Parameters:
+        path (Path): The path of the json file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: Dict[str, CacheEntry] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Load the entries from the json file, an unreadable file is ignored."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = {url: CacheEntry(**entry) for url, entry in data.items()}
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring download cache %s: %s", self.path, e)
+            self._entries = {}
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        return self._entries.get(url)
+
+    def store(self, url: str, entry: CacheEntry) -> None:
+        """Store the entry of an url and write the json file."""
+        self._entries[url] = entry
+        self.save()
+
+    def save(self) -> None:
+        """Write the json file, replacing the previous one atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {url: asdict(entry) for url, entry in self._entries.items()},
+                f,
+                indent=2,
+            )
+        os.replace(temp_path, self.path)
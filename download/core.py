@@ -4,27 +4,65 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import base64
+import binascii
+import hashlib
 import os
 import csv
+import sys
 import zipfile
-from typing import Any, AsyncIterator, Optional
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+)
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import aiohttp
 import aiofiles
+from attrs import define, field
 
-from common.config import UPDATE_PROGRESS_SECOND
+from common.config import (
+    CSV_CHUNK_SIZE,
+    DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_CONNECT_TIMEOUT,
+    DOWNLOAD_DNS_CACHE_TTL,
+    DOWNLOAD_KEEPALIVE_TIMEOUT,
+    DOWNLOAD_LIMIT_PER_HOST,
+    DOWNLOAD_RETRIES,
+    DOWNLOAD_RETRY_BACKOFF,
+    DOWNLOAD_TIMEOUT,
+    JSON_BACKEND,
+    PARSE_BATCH_SIZE,
+    PARSE_WORKERS,
+    UPDATE_PROGRESS_SECOND,
+)
 from common.logger import logger
+from download.cache import CacheEntry, DownloadCache, DownloadResult
+from download.jsonbackend import JsonDecoder, Trim, resolve_backend
+from download.parse import ParsedBatch, parse_zip_batch
+
+JSON_BACKEND_USED = resolve_backend(JSON_BACKEND)
+if JSON_BACKEND not in ("auto", JSON_BACKEND_USED):
+    logger.warning(
+        "JSON backend %s is not installed, using %s", JSON_BACKEND, JSON_BACKEND_USED
+    )
 
 
 def show_progress(
     p_url: str,
     p_content_length: Optional[str],
-    p_chunk_size: int,
-    p_nb_chunks_wrote: int,
+    p_bytes_wrote: int,
     p_last_show: Optional[datetime],
 ) -> datetime:
     """Show progress of download in log"""
@@ -33,7 +71,7 @@ def show_progress(
     if not p_last_show or (
         update_second != 0 and (now - p_last_show).seconds > update_second
     ):
-        size_wrote_chunks_mb = ((p_chunk_size * p_nb_chunks_wrote) / 1024) / 1024
+        size_wrote_chunks_mb = (p_bytes_wrote / 1024) / 1024
         ct_length_mb = (
             (int(p_content_length) / 1024) / 1024 if p_content_length else "???"
         )
@@ -47,49 +85,416 @@ def show_progress(
     return p_last_show
 
 
-async def download_file_async(url: str, file_path: Path) -> None:
+async def iter_buffered(
+    content: aiohttp.StreamReader, chunk_size: int
+) -> AsyncIterator[bytes]:
     """
-    Download a file from url to file path asynchronously.
-    Progress will show every DOWNLOAD_UPDATE_SECOND seconds (default 2).
-    To hide progress set DOWNLOAD_UPDATE_SECOND to 0.
+    Yields the body of a response in chunks of chunk_size bytes,
+    gathering the small reads of the network so that the file is written in large blocks.
+    The last chunk may be smaller.
 
     Parameters:
-        url (str) : The url of file to download.
-        file_path (Path) :
-            The path where the file must write.
-            Path must be writable and the parents folder must exist.
+        content (aiohttp.StreamReader): The body of the response.
+        chunk_size (int): The size of the yielded chunks in bytes.
+    """
+    buffer = bytearray()
+    async for data in content.iter_any():
+        buffer += data
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+class DownloadIntegrityError(Exception):
+    """Exception raised when a downloaded file does not match its announced size or digest."""
+
+
+# Errors after which a download is retried, and resumed when possible
+RETRYABLE_ERRORS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+    DownloadIntegrityError,
+)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a download failing with error may succeed on a retry."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        # Only server errors and rate limiting are temporary
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+# Names of the digest algorithms in the Digest and Repr-Digest headers, with their hashlib name
+DIGEST_ALGORITHMS = {"sha-256": "sha256", "sha-512": "sha512", "md5": "md5"}
+
+
+def parse_content_range(content_range: str) -> Tuple[int, Optional[int]]:
+    """
+    Parse a Content-Range header like "bytes 100-199/1000".
+
+    Returns:
+        Tuple[int, Optional[int]]: The first byte position and the total size if known.
     """
-    async with aiohttp.ClientSession() as session:
+    try:
+        unit, _, range_and_total = content_range.strip().partition(" ")
+        byte_range, _, total = range_and_total.partition("/")
+        start = int(byte_range.split("-")[0])
+    except ValueError:
+        raise DownloadIntegrityError(f"Invalid Content-Range {content_range!r}")
+    if unit != "bytes":
+        raise DownloadIntegrityError(f"Invalid Content-Range {content_range!r}")
+    return start, int(total) if total.isdigit() else None
+
+
+def parse_digests(headers: Mapping[str, str]) -> Dict[str, bytes]:
+    """
+    Parse the digests of a response from the Digest (RFC 3230),
+    Repr-Digest (RFC 9530) and Content-MD5 headers.
+
+    Returns:
+        Dict[str, bytes]: The expected digest for each hashlib algorithm name.
+    """
+    digests: Dict[str, bytes] = {}
+    for header in ("Digest", "Repr-Digest"):
+        for item in headers.get(header, "").split(","):
+            name, _, value = item.strip().partition("=")
+            algorithm = DIGEST_ALGORITHMS.get(name.lower())
+            if algorithm is None:
+                continue
+            try:
+                digests[algorithm] = base64.b64decode(value.strip(":"), validate=True)
+            except binascii.Error:
+                logger.warning("Ignoring invalid %s header %s", header, item)
+    if "Content-MD5" in headers:
         try:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content_length: str = response.headers.get("content-length", "0")
-
-                chunk_size: int = 4096
-                nb_chunks_wrote: int = 0
-                last_show: Optional[datetime] = None
-                with open(file_path, "wb") as f:
-                    logger.info("Downloading %s to %s", url, file_path)
-                    while True:
-                        chunk = await response.content.read(chunk_size)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                        nb_chunks_wrote += 1
-                        last_show = show_progress(
-                            url, content_length, chunk_size, nb_chunks_wrote, last_show
-                        )
+            digests["md5"] = base64.b64decode(headers["Content-MD5"], validate=True)
+        except binascii.Error:
+            logger.warning("Ignoring invalid Content-MD5 header")
+    return digests
+
+
+@define
+class _PartialDownload:
+    """State of a download kept between its attempts."""
+
+    part_path: Path
+    bytes_wrote: int = 0
+    total: Optional[int] = None
+    etag: str = ""
+    last_modified: str = ""
+    accept_ranges: bool = False
+    digests: Dict[str, bytes] = field(factory=dict)
+    hashers: Dict[str, Any] = field(factory=lambda: {"sha256": hashlib.sha256()})
+
+    @property
+    def resumable(self) -> bool:
+        return (
+            self.accept_ranges
+            and self.bytes_wrote > 0
+            and bool(self.etag or self.last_modified)
+        )
+
+    def restart(self) -> None:
+        """Forget the received bytes, the next attempt starts over."""
+        self.bytes_wrote = 0
+        self.accept_ranges = False
+        self.hashers = {"sha256": hashlib.sha256()}
+
+    def start(self, headers: Mapping[str, str]) -> None:
+        """Start over from a complete response."""
+        self.restart()
+        self.etag = headers.get("ETag", "")
+        self.last_modified = headers.get("Last-Modified", "")
+        encoded = headers.get("Content-Encoding", "identity") != "identity"
+        content_length = headers.get("Content-Length", "")
+        # With a content encoding, the length and the ranges apply to the encoded body
+        self.total = (
+            int(content_length) if content_length.isdigit() and not encoded else None
+        )
+        self.accept_ranges = headers.get("Accept-Ranges", "") == "bytes" and not encoded
+        self.digests = {} if encoded else parse_digests(headers)
+        for algorithm in self.digests:
+            self.hashers.setdefault(algorithm, hashlib.new(algorithm))
+
+    def update(self, chunk: bytes) -> None:
+        for hasher in self.hashers.values():
+            hasher.update(chunk)
+        self.bytes_wrote += len(chunk)
+
+    def verify(self, url: str) -> None:
+        """Check the complete file against the announced size and digests."""
+        if self.total is not None and self.bytes_wrote != self.total:
+            raise DownloadIntegrityError(
+                f"{url} is {self.bytes_wrote} bytes long instead of {self.total}"
+            )
+        for algorithm, expected in self.digests.items():
+            if self.hashers[algorithm].digest() != expected:
+                raise DownloadIntegrityError(
+                    f"{url} does not match its {algorithm} digest"
+                )
+
+
+class Downloader:
+    """
+    Download files through one pooled aiohttp session.
+    Connections are kept alive for DOWNLOAD_KEEPALIVE_TIMEOUT seconds and reused between downloads,
+    and resolved host names are cached for DOWNLOAD_DNS_CACHE_TTL seconds.
+    Use it as an async context manager, or call close when done.
+
+    Parameters:
+        limit_per_host (int): Maximum number of connections per host, 0 is unlimited.
+        timeout (float): Total timeout of a download in second.
+        connect_timeout (float): Timeout to acquire a connection in second.
+        dns_cache_ttl (int): Time to keep resolved host names in second.
+        keepalive_timeout (float): Time to keep an idle pooled connection open in second.
+        chunk_size (int): Size of the blocks written to disk in bytes.
+        retries (int): Number of retries of an interrupted download.
+        retry_backoff (float): Delay before the first retry in second, doubled at each retry.
+        cache (Optional[DownloadCache]):
+            The cache of the previous downloads, used to send conditional requests.
+            If not given, every download is considered changed.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = DOWNLOAD_LIMIT_PER_HOST,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        connect_timeout: float = DOWNLOAD_CONNECT_TIMEOUT,
+        dns_cache_ttl: int = DOWNLOAD_DNS_CACHE_TTL,
+        keepalive_timeout: float = DOWNLOAD_KEEPALIVE_TIMEOUT,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        retries: int = DOWNLOAD_RETRIES,
+        retry_backoff: float = DOWNLOAD_RETRY_BACKOFF,
+        cache: Optional[DownloadCache] = None,
+    ) -> None:
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.chunk_size = max(1, chunk_size)
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.cache = cache
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use inside the running event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> Downloader:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def commit(self, result: DownloadResult) -> None:
+        """
+        Store the validators of a download in the cache.
+        Must be called once the downloaded file has been successfully processed,
+        so that a failed update is retried on the next run.
+        """
+        if self.cache is not None and result.changed:
+            self.cache.store(result.url, result.entry)
+
+    async def download(
+        self, url: str, file_path: Path, force: bool = False
+    ) -> DownloadResult:
+        """
+        Download a file from url to file path asynchronously.
+        When the url is in the cache, the request is conditional
+        and the file is not written if the server answers 304 Not Modified.
+        The file is first written to a .part file: when the connection drops,
+        the download is retried with an exponential backoff and resumed with a Range request
+        if the server accepts it. The complete file is checked against the Content-Length
+        and the digests sent by the server before being renamed to file path.
+        Progress will show every DOWNLOAD_UPDATE_SECOND seconds (default 2).
+        To hide progress set DOWNLOAD_UPDATE_SECOND to 0.
+
+        Parameters:
+            url (str) : The url of file to download.
+            file_path (Path) :
+                The path where the file must write.
+                Path must be writable and the parents folder must exist.
+            force (bool) : Ignore the cache and always download the file.
+
+        Returns:
+            DownloadResult: Whether the file changed since the cached download.
+        """
+        previous: Optional[CacheEntry] = (
+            self.cache.get(url) if self.cache is not None and not force else None
+        )
+        state = _PartialDownload(
+            part_path=file_path.with_name(f"{file_path.name}.part")
+        )
+
+        try:
+            attempt: int = 0
+            while True:
+                try:
+                    if not await self._fetch(url, state, previous):
+                        # A 304 only answers the conditional request of a cached entry
+                        assert previous is not None
+                        logger.info("%s not modified since last download", url)
+                        return DownloadResult(url=url, changed=False, entry=previous)
+                    state.verify(url)
+                    break
+                except (*RETRYABLE_ERRORS, aiohttp.ClientResponseError) as e:
+                    if attempt >= self.retries or not is_retryable(e):
+                        raise
+                    delay = self.retry_backoff * 2**attempt
+                    attempt += 1
+                    logger.warning(
+                        "Download of %s interrupted at %d bytes (%s), retry %d/%d in %.1fs",
+                        url,
+                        state.bytes_wrote,
+                        str(e) or type(e).__name__,
+                        attempt,
+                        self.retries,
+                        delay,
+                    )
+                    if isinstance(e, DownloadIntegrityError):
+                        state.restart()
+                    await asyncio.sleep(delay)
+            os.replace(state.part_path, file_path)
         except (aiohttp.ClientConnectionError, aiohttp.InvalidURL):
             logger.error("Connection error from %s", url)
             raise
         except aiohttp.ClientResponseError:
             logger.error("Invalid response from %s", url)
             raise
+        except DownloadIntegrityError:
+            logger.error("Corrupted download from %s", url)
+            raise
         except FileNotFoundError:
             logger.error("Invalid path %s", file_path)
             raise
 
-    logger.info("Download done")
+        logger.info("Download done")
+
+        entry = CacheEntry(
+            etag=state.etag,
+            last_modified=state.last_modified,
+            sha256=state.hashers["sha256"].hexdigest(),
+        )
+        if previous is not None and previous.sha256 == entry.sha256:
+            logger.info("%s content did not change since last download", url)
+            if self.cache is not None and entry != previous:
+                # Same content with new validators, keep them for the next requests
+                self.cache.store(url, entry)
+            return DownloadResult(url=url, changed=False, entry=entry)
+        return DownloadResult(url=url, changed=True, entry=entry)
+
+    async def _fetch(
+        self, url: str, state: _PartialDownload, previous: Optional[CacheEntry]
+    ) -> bool:
+        """
+        Send one request and append the received bytes to the .part file.
+        Resumes the .part file when possible, otherwise starts over.
+
+        Returns:
+            bool: False if the server answered 304 Not Modified.
+        """
+        headers: Dict[str, str] = {}
+        if state.resumable:
+            headers["Range"] = f"bytes={state.bytes_wrote}-"
+            # Only resume if the file did not change since the first attempt
+            headers["If-Range"] = state.etag or state.last_modified
+        elif previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+        conditional = "If-None-Match" in headers or "If-Modified-Since" in headers
+
+        async with self.session.get(url, headers=headers) as response:
+            if conditional and response.status == 304:
+                return False
+            if response.status == 416:
+                raise DownloadIntegrityError(
+                    f"Cannot resume {url} at {state.bytes_wrote}"
+                )
+            response.raise_for_status()
+
+            mode: Literal["ab", "wb"]
+            if response.status == 206:
+                start, total = parse_content_range(
+                    response.headers.get("Content-Range", "")
+                )
+                if start != state.bytes_wrote:
+                    raise DownloadIntegrityError(
+                        f"{url} resumed at {start} instead of {state.bytes_wrote}"
+                    )
+                if total is not None:
+                    state.total = total
+                # Drop the bytes written but not hashed by the interrupted attempt
+                await asyncio.to_thread(os.truncate, state.part_path, state.bytes_wrote)
+                mode = "ab"
+                logger.info("Resuming download of %s at %d bytes", url, start)
+            else:
+                state.start(response.headers)
+                mode = "wb"
+
+            last_show: Optional[datetime] = None
+            async with aiofiles.open(state.part_path, mode) as f:
+                logger.info("Downloading %s to %s", url, state.part_path)
+                async for chunk in iter_buffered(response.content, self.chunk_size):
+                    # aiofiles runs the write in a thread, off the event loop
+                    await f.write(chunk)
+                    state.update(chunk)
+                    last_show = show_progress(
+                        url, str(state.total or 0), state.bytes_wrote, last_show
+                    )
+        return True
+
+
+async def download_file_async(
+    url: str,
+    file_path: Path,
+    downloader: Optional[Downloader] = None,
+    force: bool = False,
+) -> DownloadResult:
+    """
+    Download a file from url to file path asynchronously.
+
+    Parameters:
+        url (str) : The url of file to download.
+        file_path (Path) :
+            The path where the file must write.
+            Path must be writable and the parents folder must exist.
+        downloader (Optional[Downloader]) :
+            The downloader owning the pooled session.
+            If not given, a session is opened for this download only.
+        force (bool) : Ignore the cache of the downloader and always download the file.
+
+    Returns:
+        DownloadResult: Whether the file changed since the cached download.
+    """
+    if downloader is not None:
+        return await downloader.download(url, file_path, force)
+
+    async with Downloader() as single_use_downloader:
+        return await single_use_downloader.download(url, file_path, force)
 
 
 def unzip_file(path: Path, dst_folder: Path) -> None:
@@ -126,34 +531,306 @@ async def unzip_file_async(path: Path, dst_folder: Path) -> None:
         await loop.run_in_executor(pool, unzip_file, path, dst_folder)
 
 
-async def read_csv(file_path: Path) -> Any:
-    async with aiofiles.open(file_path, mode="r", encoding="utf-8") as f:
-        contents = await f.readlines()
-        reader = csv.DictReader(contents, delimiter=",", lineterminator="\n")
-        return reader
+def split_csv_records(
+    lines: List[str], pending: List[str], quoted: bool
+) -> Tuple[List[str], bool]:
+    """
+    Groups complete lines of a csv file into records.
+    A line ends a record only when the quotes seen since the start of the record are balanced,
+    otherwise the newline is inside a quoted field and the record goes on with the next line.
+    Escaped quotes ("") do not change the parity.
 
+    Parameters:
+        lines (List[str]): The lines to group, without their newline.
+        pending (List[str]): The lines of the record left open by the previous call, updated in place.
+        quoted (bool): Whether the pending record ends inside a quoted field.
 
-async def read_json(file_path: Path) -> Any:
-    async with aiofiles.open(file_path, mode="r", encoding="utf-8") as f:
-        contents = await f.read()
-        return json.loads(contents)
+    Returns:
+        Tuple[List[str], bool]: The complete records and whether the pending record is still inside quotes.
+    """
+    records: List[str] = []
+    for line in lines:
+        pending.append(line)
+        if line.count('"') % 2:
+            quoted = not quoted
+        if not quoted:
+            records.append("\n".join(pending) + "\n")
+            pending.clear()
+    return records, quoted
 
 
-async def read_jsons_from_directory(directory: Path) -> AsyncIterator[Any]:
+async def read_csv_batches(
+    file_path: Path, chunk_size: int = CSV_CHUNK_SIZE
+) -> AsyncIterator[List[Dict[str, str]]]:
     """
-    Reads and yields the Any data of each file in a given directory.
-    Skips files that cannot be read or parsed.
+    Streams the rows of a csv file with a header line, reading it by chunks of chunk_size characters.
+    Only the records of the current chunk are held in memory.
 
     Parameters:
-        directory (Path): The directory containing the files to be read.
+        file_path (Path): The csv file.
+        chunk_size (int): The number of characters read at once.
 
     Yields:
-        Any: The parsed Any data from each file.
+        List[Dict[str, str]]: The rows of each chunk, keyed by the names of the header.
     """
-    for file in os.listdir(directory):
-        file_path = directory / file
-        try:
-            yield await read_json(file_path)
-        except (OSError, json.JSONDecodeError) as e:
-            logger.error("Error reading %s: %s", file, e)
+    fieldnames: Optional[List[str]] = None
+    pending: List[str] = []
+    quoted = False
+    tail = ""
+
+    async with aiofiles.open(file_path, mode="r", encoding="utf-8", newline="") as f:
+        while True:
+            chunk = await f.read(chunk_size)
+            if chunk:
+                lines = (tail + chunk).split("\n")
+                tail = lines.pop()
+            else:
+                # End of file, the last line may not end with a newline
+                lines = [tail] if tail else []
+
+            records, quoted = split_csv_records(lines, pending, quoted)
+            if not chunk and pending:
+                # Unbalanced quotes at the end of the file, let csv report the row as it can
+                records.append("\n".join(pending))
+                pending.clear()
+
+            if fieldnames is None and records:
+                fieldnames = next(csv.reader(records[:1]))
+                records = records[1:]
+
+            if records:
+                yield list(csv.DictReader(records, fieldnames=fieldnames))
+
+            if not chunk:
+                return
+
+
+_parse_executor: Optional[Executor] = None
+
+
+def parse_workers() -> int:
+    """The number of workers of the parse pool, from PARSE_WORKERS."""
+    return PARSE_WORKERS if PARSE_WORKERS > 0 else os.cpu_count() or 1
+
+
+def get_parse_executor() -> Optional[Executor]:
+    """
+    Returns the pool shared by the json parsing, created on first use.
+    It is a process pool, or a thread pool when the interpreter runs without the GIL.
+    Returns None when PARSE_WORKERS is 1: the parsing then runs in the default thread.
+    """
+    global _parse_executor
+    workers = parse_workers()
+    if workers <= 1:
+        return None
+    if _parse_executor is None:
+        gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+        if gil_enabled:
+            _parse_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _parse_executor = ThreadPoolExecutor(max_workers=workers)
+        logger.debug(
+            "Parse pool started with %d %s",
+            workers,
+            "processes" if gil_enabled else "threads",
+        )
+    return _parse_executor
+
+
+def shutdown_parse_executor() -> None:
+    """Stops the workers of the parse pool."""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown()
+        _parse_executor = None
+
+
+def parse_window() -> int:
+    """The number of batches parsed at the same time, two per worker of the parse pool."""
+    return 2 * parse_workers() if get_parse_executor() else 2
+
+
+def parsed_documents(parsed: ParsedBatch) -> List[Any]:
+    """The documents of a parsed batch, logging the ones that could not be read or parsed."""
+    documents: List[Any] = []
+    for name, data, error in parsed:
+        if error is not None:
+            logger.error("Error reading %s: %s", name, error)
             continue
+        documents.append(data)
+    return documents
+
+
+async def parse_json_batch(
+    parse_batch: Callable[[str, List[str], JsonDecoder], ParsedBatch],
+    source: str,
+    names: List[str],
+    decoder: JsonDecoder,
+) -> List[Any]:
+    """
+    Parses a batch of json documents in the parse pool.
+    Skips documents that cannot be read or parsed.
+
+    Parameters:
+        parse_batch (Callable): The worker function reading and parsing a batch.
+        source (str): The zip archive given to parse_batch.
+        names (List[str]): The names of the documents.
+        decoder (JsonDecoder): Decodes each document in the worker.
+
+    Returns:
+        List[Any]: The parsed, and trimmed, data of the documents, in the order of names.
+    """
+    loop = asyncio.get_running_loop()
+    return parsed_documents(
+        await loop.run_in_executor(
+            get_parse_executor(), parse_batch, source, names, decoder
+        )
+    )
+
+
+async def parse_json_batches_parallel(
+    parse_batch: Callable[[str, List[str], JsonDecoder], ParsedBatch],
+    source: str,
+    names: List[str],
+    decoder: JsonDecoder,
+    batch_size: int = PARSE_BATCH_SIZE,
+) -> AsyncIterator[List[Any]]:
+    """
+    Parses json documents by batch in the parse pool and yields each batch in their original order.
+    At most two batches per worker are in flight, which bounds the memory used.
+    Skips documents that cannot be read or parsed.
+
+    Parameters:
+        parse_batch (Callable): The worker function reading and parsing a batch.
+        source (str): The zip archive given to parse_batch.
+        names (List[str]): The names of the documents, in the order to yield them.
+        decoder (JsonDecoder): Decodes each document in the worker.
+        batch_size (int): The number of documents parsed by each task.
+
+    Yields:
+        List[Any]: The parsed, and trimmed, data of the documents of each batch.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_parse_executor()
+    window = parse_window()
+    batch_size = max(1, batch_size)
+    pending: Deque[asyncio.Future[ParsedBatch]] = deque()
+
+    async def consume() -> List[Any]:
+        return parsed_documents(await pending.popleft())
+
+    for i in range(0, len(names), batch_size):
+        pending.append(
+            loop.run_in_executor(
+                executor, parse_batch, source, names[i : i + batch_size], decoder
+            )
+        )
+        if len(pending) >= window:
+            yield await consume()
+    while pending:
+        yield await consume()
+
+
+async def parse_jsons_parallel(
+    parse_batch: Callable[[str, List[str], JsonDecoder], ParsedBatch],
+    source: str,
+    names: List[str],
+    decoder: JsonDecoder,
+    batch_size: int = PARSE_BATCH_SIZE,
+) -> AsyncIterator[Any]:
+    """Yields the documents of parse_json_batches_parallel one at a time."""
+    async for documents in parse_json_batches_parallel(
+        parse_batch, source, names, decoder, batch_size
+    ):
+        for data in documents:
+            yield data
+
+
+class JsonZipArchive:
+    """
+    Reads json documents straight from the members of a zip file,
+    without extracting them to disk.
+    Use it as a context manager, or call close when done.
+
+    Parameters:
+        path (Path): The path of the zip file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            self._zip = zipfile.ZipFile(path, "r")
+        except zipfile.BadZipFile:
+            logger.error("%s is not a correct Zip File.", path)
+            raise
+        except FileNotFoundError:
+            logger.error("%s does not exist.", path)
+            raise
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> JsonZipArchive:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def names(self, folder: str) -> List[str]:
+        """
+        Lists the json members directly in a folder of the archive.
+
+        Parameters:
+            folder (str): The folder in the archive, e.g. "json/acteur/".
+        """
+        return [
+            name
+            for name in self._zip.namelist()
+            if name.startswith(folder)
+            and name.endswith(".json")
+            and "/" not in name[len(folder) :]
+        ]
+
+    async def read_jsons(
+        self, folder: str, trim: Trim = None, schema: Any = None
+    ) -> AsyncIterator[Any]:
+        """
+        Reads and yields the Any data of each json member in a folder of the archive.
+        Members are decompressed and parsed in parallel in the parse pool,
+        and yielded in the order of the archive.
+        Skips members that cannot be read or parsed.
+
+        Parameters:
+            folder (str): The folder in the archive, e.g. "json/acteur/".
+            trim (Trim): Applied to each parsed member in the worker if given.
+            schema (Any): The msgspec Struct type of the members, see JsonDecoder.
+
+        Yields:
+            Any: The parsed Any data from each member.
+        """
+        async for data in parse_jsons_parallel(
+            parse_zip_batch,
+            str(self.path),
+            self.names(folder),
+            JsonDecoder(JSON_BACKEND_USED, schema, trim),
+        ):
+            yield data
+
+    async def parse_batch(
+        self, names: List[str], trim: Trim = None, schema: Any = None
+    ) -> List[Any]:
+        """
+        Parses a batch of json members of the archive in the parse pool, e.g. for a stage of a pipeline.
+        Skips members that cannot be read or parsed.
+
+        Parameters:
+            names (List[str]): The names of the members, see names.
+            trim (Trim): Applied to each parsed member in the worker if given.
+            schema (Any): The msgspec Struct type of the members, see JsonDecoder.
+        """
+        return await parse_json_batch(
+            parse_zip_batch,
+            str(self.path),
+            names,
+            JsonDecoder(JSON_BACKEND_USED, schema, trim),
+        )
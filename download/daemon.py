@@ -0,0 +1,169 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Long-running update: one event loop refreshing each chamber on its own interval,
+keeping the http session, the download cache, the postgres pool and the parse pool
+alive between the updates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import signal
+from typing import Dict
+
+from common.config import (
+    DAEMON_INTERVAL_DEPUTES,
+    DAEMON_INTERVAL_EUROPARL,
+    DAEMON_INTERVAL_SENAT,
+    DAEMON_JITTER,
+    DAEMON_RETRY_BACKOFF,
+    DOWNLOAD_CACHE_ENABLED,
+    DOWNLOAD_CACHE_PATH,
+    UPDATE_CONCURRENCY,
+    UPDATE_LOCK_PATH,
+)
+from common.database import close_pool
+from common.lock import FileLock, LockedError
+from common.logger import logger
+from download.cache import DownloadCache
+from download.core import Downloader, shutdown_parse_executor
+from common.metrics import UpdateReport, record_update
+from download.update import (
+    CHAMBERS,
+    run_chamber,
+    update_chamber,
+    update_index,
+    write_report,
+)
+
+DAEMON_INTERVALS: Dict[str, float] = {
+    "deputes": DAEMON_INTERVAL_DEPUTES,
+    "senat": DAEMON_INTERVAL_SENAT,
+    "europarl": DAEMON_INTERVAL_EUROPARL,
+}
+
+
+def jittered(delay: float, jitter: float = DAEMON_JITTER) -> float:
+    """The delay moved randomly by up to jitter times itself, so that the chambers drift apart."""
+    return max(0.0, delay * (1 + random.uniform(-jitter, jitter)))
+
+
+def next_delay(interval: float, failures: int) -> float:
+    """
+    The time to wait before the next update of a chamber.
+
+    Parameters:
+        interval (float): The time between two updates of the chamber in second.
+        failures (int): The number of consecutive failed updates of the chamber.
+
+    Returns:
+        float: The interval after a success, otherwise the retry backoff
+            doubled at each failure, never longer than the interval.
+    """
+    if failures == 0:
+        return jittered(interval)
+    return jittered(min(DAEMON_RETRY_BACKOFF * 2 ** (failures - 1), interval))
+
+
+async def wait_or_stop(stop: asyncio.Event, delay: float) -> None:
+    """Sleeps for delay, or less if stop is set meanwhile."""
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=delay)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_periodically(
+    name: str,
+    downloader: Downloader,
+    semaphore: asyncio.Semaphore,
+    publish_lock: asyncio.Lock,
+    report: UpdateReport,
+    stop: asyncio.Event,
+) -> None:
+    """
+    Updates one chamber until stop is set, waiting its interval between two updates.
+    A failed update is retried sooner, with an exponential backoff,
+    without changing the schedule of the other chambers.
+    The updates of a chamber run one after another, so they never overlap.
+    After each update, the index and the report, shared by every chamber, are refreshed.
+    """
+    interval = DAEMON_INTERVALS[name]
+    failures = 0
+    while not stop.is_set():
+        result = await run_chamber(
+            name, lambda: update_chamber(name, downloader), semaphore
+        )
+        failures = 0 if result.success else failures + 1
+        async with publish_lock:
+            await update_index()
+            await write_report(report)
+
+        delay = next_delay(interval, failures)
+        if failures:
+            logger.warning(
+                "%s failed %d time(s) in a row, retrying in %.0fs",
+                name,
+                failures,
+                delay,
+            )
+        else:
+            logger.info("Next update of %s in %.0fs", name, delay)
+        await wait_or_stop(stop, delay)
+
+
+def install_stop_handlers(stop: asyncio.Event) -> None:
+    """Sets stop on SIGINT and SIGTERM, the running updates finish before the daemon exits."""
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: SIGINT still raises KeyboardInterrupt
+            pass
+
+
+async def run_daemon() -> None:
+    """
+    Runs the updates of every chamber until SIGINT or SIGTERM.
+    The update lock is held for the whole life of the daemon,
+    so a one-shot update started meanwhile is skipped instead of racing it.
+    """
+    lock = FileLock(UPDATE_LOCK_PATH)
+    try:
+        lock.acquire()
+    except LockedError as e:
+        logger.error("=== Daemon not started : %s ===", e)
+        return
+
+    stop = asyncio.Event()
+    install_stop_handlers(stop)
+    logger.info(
+        "=== Daemon started, intervals : %s ===",
+        ", ".join(
+            f"{name} {interval:.0f}s" for name, interval in DAEMON_INTERVALS.items()
+        ),
+    )
+    try:
+        cache = DownloadCache(DOWNLOAD_CACHE_PATH) if DOWNLOAD_CACHE_ENABLED else None
+        async with Downloader(cache=cache) as downloader:
+            semaphore = asyncio.Semaphore(max(1, UPDATE_CONCURRENCY))
+            publish_lock = asyncio.Lock()
+            # The report keeps the last update of each chamber
+            with record_update(UpdateReport()) as report:
+                await asyncio.gather(
+                    *(
+                        run_periodically(
+                            name, downloader, semaphore, publish_lock, report, stop
+                        )
+                        for name in CHAMBERS
+                    )
+                )
+    finally:
+        await close_pool()
+        shutdown_parse_executor()
+        lock.release()
+        logger.info("=== Daemon stopped ===")
@@ -0,0 +1,92 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Pluggable json decoding: msgspec or orjson when installed, the standard library otherwise.
+This module is imported by each parse pool worker, so it must not import
+the configuration or the logger, which have side effects.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, List, Optional
+
+from attrs import frozen
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+# Trims a parsed document to the fields used by the processing
+Trim = Optional[Callable[[Any], Any]]
+
+# Backends by order of preference for "auto"
+BACKENDS = ("msgspec", "orjson", "json")
+
+
+def available_backends() -> List[str]:
+    """The installed backends, by order of preference."""
+    installed = {"msgspec": msgspec is not None, "orjson": orjson is not None}
+    return [backend for backend in BACKENDS if installed.get(backend, True)]
+
+
+def resolve_backend(name: str) -> str:
+    """
+    Returns the backend to use for a configured name.
+    "auto", or a backend that is not installed, resolves to the preferred installed one.
+    """
+    available = available_backends()
+    return name if name in available else available[0]
+
+
+@lru_cache(maxsize=None)
+def get_loads(backend: str) -> Callable[[bytes], Any]:
+    """Returns the function decoding json bytes to python objects for a backend."""
+    if backend == "msgspec" and msgspec is not None:
+        return msgspec.json.Decoder().decode
+    if backend == "orjson" and orjson is not None:
+        return orjson.loads
+    return json.loads
+
+
+@lru_cache(maxsize=None)
+def _typed_decoder(schema: Any) -> Any:
+    return msgspec.json.Decoder(schema)
+
+
+@frozen
+class JsonDecoder:
+    """
+    Decodes json bytes with a backend. Picklable, so it can be sent to the parse pool.
+
+    Parameters:
+        backend (str): The backend, one of BACKENDS.
+        schema (Any):
+            A msgspec Struct type describing the fields to keep.
+            With the msgspec backend, only these fields are decoded, straight from the bytes;
+            documents that do not match the schema are decoded entirely.
+        trim (Trim): Applied to each decoded document if given.
+    """
+
+    backend: str = "json"
+    schema: Any = None
+    trim: Trim = None
+
+    def __call__(self, content: bytes) -> Any:
+        data: Any = None
+        if self.backend == "msgspec" and self.schema is not None:
+            try:
+                data = msgspec.to_builtins(_typed_decoder(self.schema).decode(content))
+            except msgspec.ValidationError:
+                data = None
+        if data is None:
+            data = get_loads(self.backend)(content)
+        return self.trim(data) if self.trim else data
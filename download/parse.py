@@ -0,0 +1,59 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Json parsing workers run in the parse pool.
+This module is imported by each worker process, so it must not import
+the configuration or the logger, which have side effects.
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from download.jsonbackend import JsonDecoder
+
+# Parsed documents of a batch: (name, data, error), data is None when error is set
+ParsedBatch = List[Tuple[str, Any, Optional[str]]]
+
+
+@lru_cache(maxsize=4)
+def _open_zip(path: str, mtime_ns: int, size: int) -> zipfile.ZipFile:
+    """Keeps the archive open in the worker, its central directory is read only once."""
+    return zipfile.ZipFile(path, "r")
+
+
+def _parse(
+    name: str, content: bytes, decoder: JsonDecoder
+) -> Tuple[str, Any, Optional[str]]:
+    try:
+        return name, decoder(content), None
+    except ValueError as e:
+        return name, None, str(e)
+
+
+def parse_zip_batch(
+    zip_path: str, names: List[str], decoder: JsonDecoder
+) -> ParsedBatch:
+    """
+    Reads and parses a batch of json members of a zip archive.
+
+    Parameters:
+        zip_path (str): The path of the zip archive.
+        names (List[str]): The names of the members to parse.
+        decoder (JsonDecoder): Decodes each document.
+    """
+    stat = os.stat(zip_path)
+    archive = _open_zip(zip_path, stat.st_mtime_ns, stat.st_size)
+    parsed: ParsedBatch = []
+    for name in names:
+        try:
+            content = archive.read(name)
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            parsed.append((name, None, str(e)))
+            continue
+        parsed.append(_parse(name, content, decoder))
+    return parsed
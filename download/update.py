@@ -4,19 +4,67 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from functools import partial
 from pathlib import Path
 import tempfile
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from attrs import define
 
 from common.config import (
+    DOWNLOAD_CACHE_ENABLED,
+    DOWNLOAD_CACHE_PATH,
+    OUTPUT_INDEX_ENABLED,
+    REPORT_PATH,
+    REPORT_PROMETHEUS_PATH,
+    UPDATE_LOCK_PATH,
+    UPDATE_CONCURRENCY,
     UPDATE_URL_DOWNLOAD_DEPUTES,
     UPDATE_URL_DOWNLOAD_SENAT,
     UPDATE_URL_DOWNLOAD_EUROPARL,
 )
-from download.core import download_file_async, unzip_file_async
+from download.cache import DownloadCache
+from download.core import Downloader, download_file_async, unzip_file_async
+from common.database import close_pool
+from common.lock import FileLock, LockedError
+from common.metrics import (
+    UpdateReport,
+    record_chamber,
+    record_update,
+    report_json,
+    report_prometheus,
+    set_changed,
+    stage,
+)
 from common.logger import logger
-from process.depute import process_file_deputy_async
-from process.senat import process_file_senat_async
-from process.europarl import process_file_europarl_async
+from process.depute import (
+    DEPUTIES_OUTPUT_FILE,
+    DEPUTIES_OUTPUT_NAME,
+    process_file_deputy_async,
+)
+from process.senat import SENAT_OUTPUT_FILE, SENAT_OUTPUT_NAME, process_file_senat_async
+from process.europarl import (
+    EUROPARL_OUTPUT_FILE,
+    EUROPARL_OUTPUT_NAME,
+    process_file_europarl_async,
+)
+from process.index import refresh_index
+from process.output import file_size, write_atomically
+
+
+@define
+class ChamberResult:
+    """Outcome of the update of one chamber."""
+
+    name: str
+    success: bool
+    duration: float
+    error: Optional[Exception] = None
+
+
+# Updates a chamber, given the shared downloader and a temporary download and unzip folder
+ChamberUpdate = Callable[[Downloader, Path, Path], Awaitable[None]]
 
 
 def show_error_on_exception(msg: str, exception: Exception) -> None:
@@ -25,61 +73,90 @@ def show_error_on_exception(msg: str, exception: Exception) -> None:
     logger.error("Error : %s", str(exception))
 
 
-async def update_deputes(download_temp: Path, zip_temp: Path) -> None:
+async def update_deputes(
+    downloader: Downloader,
+    download_temp: Path,
+    url: str = UPDATE_URL_DOWNLOAD_DEPUTES,
+) -> None:
     """
-    Update the data folder with fresh data from UPDATE_URL_DOWNLOAD_DEPUTES.
+    Update the data folder with fresh data from url, UPDATE_URL_DOWNLOAD_DEPUTES by default.
+    Skipped when the file did not change since the last successful update.
     """
     logger.info("=== Update starting for deputes ===")
     # Download File to zip download folder
     zip_file_deputes: Path = download_temp / "data_deputes.zip"
     try:
-        await download_file_async(UPDATE_URL_DOWNLOAD_DEPUTES, zip_file_deputes)
+        with stage("download") as metrics:
+            download_result = await download_file_async(
+                url,
+                zip_file_deputes,
+                downloader,
+                force=not DEPUTIES_OUTPUT_FILE.exists(),
+            )
+            metrics.bytes_in += file_size(zip_file_deputes)
     except Exception as e:
         show_error_on_exception("download failed", e)
         raise e
 
-    await asyncio.sleep(0.1)
-
-    # Unzip File to zip temp folder
-    zip_temp_deputes: Path = zip_temp / "deputes"
-    try:
-        await unzip_file_async(zip_file_deputes, zip_temp_deputes)
-    except Exception as e:
-        show_error_on_exception("unzipping failed", e)
-        raise e
+    set_changed(download_result.changed)
+    if not download_result.changed:
+        logger.info("=== No change for deputes, update skipped ===")
+        return
 
     await asyncio.sleep(0.1)
 
-    temp_acteur: Path = zip_temp_deputes / "json" / "acteur"
-    temp_organe: Path = zip_temp_deputes / "json" / "organe"
     try:
-        await process_file_deputy_async(temp_acteur, temp_organe)
+        await process_file_deputy_async(zip_file_deputes)
     except Exception as e:
         show_error_on_exception("process failed", e)
         raise e
 
+    downloader.commit(download_result)
     logger.info("=== Update success for deputes ===")
 
 
-async def update_senat(download_temp: Path, zip_temp: Path) -> None:
+async def update_senat(
+    downloader: Downloader,
+    download_temp: Path,
+    zip_temp: Path,
+    url: str = UPDATE_URL_DOWNLOAD_SENAT,
+) -> None:
     """
-    Update the data folder with fresh data from UPDATE_URL_DOWNLOAD_SENAT.
+    Update the data folder with fresh data from url, UPDATE_URL_DOWNLOAD_SENAT by default.
+    Skipped when the file did not change since the last successful update.
     """
     logger.info("=== Update starting for senat ===")
     # Download File to zip download folder
     zip_file_senat: Path = download_temp / "data_senat.zip"
     try:
-        await download_file_async(UPDATE_URL_DOWNLOAD_SENAT, zip_file_senat)
+        with stage("download") as metrics:
+            download_result = await download_file_async(
+                url,
+                zip_file_senat,
+                downloader,
+                force=not SENAT_OUTPUT_FILE.exists(),
+            )
+            metrics.bytes_in += file_size(zip_file_senat)
     except Exception as e:
         show_error_on_exception("download failed", e)
         raise e
 
+    set_changed(download_result.changed)
+    if not download_result.changed:
+        logger.info("=== No change for senat, update skipped ===")
+        return
+
     await asyncio.sleep(0.1)
 
     # Unzip File to zip temp folder
     zip_temp_senat: Path = zip_temp / "senat"
     try:
-        await unzip_file_async(zip_file_senat, zip_temp_senat)
+        with stage("unzip") as metrics:
+            await unzip_file_async(zip_file_senat, zip_temp_senat)
+            metrics.bytes_in += file_size(zip_file_senat)
+            metrics.bytes_out += sum(
+                file_size(path) for path in zip_temp_senat.rglob("*")
+            )
     except Exception as e:
         show_error_on_exception("unzipping failed", e)
         raise e
@@ -93,22 +170,40 @@ async def update_senat(download_temp: Path, zip_temp: Path) -> None:
         show_error_on_exception("process failed", e)
         raise e
 
+    downloader.commit(download_result)
     logger.info("=== Update success for senat ===")
 
 
-async def update_europarl(download_temp: Path) -> None:
+async def update_europarl(
+    downloader: Downloader,
+    download_temp: Path,
+    url: str = UPDATE_URL_DOWNLOAD_EUROPARL,
+) -> None:
     """
-    Update the data folder with fresh data from UPDATE_URL_DOWNLOAD_EUROPARL.
+    Update the data folder with fresh data from url, UPDATE_URL_DOWNLOAD_EUROPARL by default.
+    Skipped when the file did not change since the last successful update.
     """
     logger.info("=== Update starting for europarl ===")
     # Download File to zip download folder
     file_europarl: Path = download_temp / "data_europarl.csv"
     try:
-        await download_file_async(UPDATE_URL_DOWNLOAD_EUROPARL, file_europarl)
+        with stage("download") as metrics:
+            download_result = await download_file_async(
+                url,
+                file_europarl,
+                downloader,
+                force=not EUROPARL_OUTPUT_FILE.exists(),
+            )
+            metrics.bytes_in += file_size(file_europarl)
     except Exception as e:
         show_error_on_exception("download failed", e)
         raise e
 
+    set_changed(download_result.changed)
+    if not download_result.changed:
+        logger.info("=== No change for europarl, update skipped ===")
+        return
+
     await asyncio.sleep(0.1)
 
     try:
@@ -117,45 +212,159 @@ async def update_europarl(download_temp: Path) -> None:
         show_error_on_exception("process failed", e)
         raise e
 
+    downloader.commit(download_result)
     logger.info("=== Update success for europarl ===")
 
 
-async def update_async() -> None:
-    """
-    Update the data folder with fresh data from
-    UPDATE_URL_DOWNLOAD_deputes.
-    """
+CHAMBERS: Dict[str, ChamberUpdate] = {
+    "deputes": lambda downloader, download_temp, _: update_deputes(
+        downloader, download_temp
+    ),
+    "senat": update_senat,
+    "europarl": lambda downloader, download_temp, _: update_europarl(
+        downloader, download_temp
+    ),
+}
+
+# Output names of the chambers, in the order of CHAMBERS
+OUTPUT_NAMES = [DEPUTIES_OUTPUT_NAME, SENAT_OUTPUT_NAME, EUROPARL_OUTPUT_NAME]
 
-    logger.info("=== Update starting ===")
 
+async def update_chamber(name: str, downloader: Downloader) -> None:
+    """Update one chamber of CHAMBERS in its own temporary folders."""
     with (
         tempfile.TemporaryDirectory() as download_temp,
         tempfile.TemporaryDirectory() as zip_temp,
     ):
-        download_path: Path = Path(download_temp)
-        zip_path: Path = Path(zip_temp)
-        try:
-            await update_deputes(download_path, zip_path)
-        except Exception as e:
-            logger.error("=== Update deputes failed ===")
-            raise e
-        try:
-            await update_senat(download_path, zip_path)
-        except Exception as e:
-            logger.error("=== Update senat failed ===")
-            raise e
-        try:
-            await update_europarl(download_path)
-        except Exception as e:
-            logger.error("=== Update europarl failed ===")
-            raise e
-
-    logger.info("=== Update success ===")
+        await CHAMBERS[name](downloader, Path(download_temp), Path(zip_temp))
+
+
+async def update_index() -> None:
+    """Refresh the index of the members when enabled, without failing the update."""
+    if not OUTPUT_INDEX_ENABLED:
+        return
+    try:
+        with stage("index"):
+            await asyncio.to_thread(refresh_index, OUTPUT_NAMES)
+    except Exception as e:
+        show_error_on_exception("index failed", e)
+
+
+async def write_report(report: UpdateReport) -> None:
+    """Write the report of the update to REPORT_PATH and REPORT_PROMETHEUS_PATH, without failing the update."""
+    # Rendered in the event loop, as the chambers still running keep changing the report
+    outputs = [(REPORT_PATH, report_json(report))]
+    if REPORT_PROMETHEUS_PATH:
+        outputs.append((Path(REPORT_PROMETHEUS_PATH), report_prometheus(report)))
+    try:
+        for path, content in outputs:
+            await asyncio.to_thread(write_atomically, path, content)
+    except Exception as e:
+        show_error_on_exception("report failed", e)
+
+
+async def run_chamber(
+    name: str,
+    update_chamber: Callable[[], Awaitable[None]],
+    semaphore: asyncio.Semaphore,
+) -> ChamberResult:
+    """
+    Run the update of one chamber, isolating its failure from the other chambers.
+    Its stages are recorded in the report of the update, if any.
+
+    Parameters:
+        name (str): The name of the chamber, used in logs.
+        update_chamber (Callable): The coroutine function updating the chamber.
+        semaphore (asyncio.Semaphore): Limits the number of chambers updated at once.
+
+    Returns:
+        ChamberResult: The status and the duration of the update.
+    """
+    async with semaphore:
+        with record_chamber(name) as chamber_report:
+            start = time.perf_counter()
+            try:
+                await update_chamber()
+            except Exception as e:
+                duration = time.perf_counter() - start
+                logger.error("=== Update %s failed in %.2fs ===", name, duration)
+                result = ChamberResult(
+                    name=name, success=False, duration=duration, error=e
+                )
+            else:
+                duration = time.perf_counter() - start
+                logger.info("=== Update %s done in %.2fs ===", name, duration)
+                result = ChamberResult(name=name, success=True, duration=duration)
+
+            if chamber_report is not None:
+                chamber_report.success = result.success
+                chamber_report.duration = result.duration
+                chamber_report.error = (
+                    None if result.error is None else str(result.error)
+                )
+        return result
+
+
+async def update_async(downloader: Optional[Downloader] = None) -> List[ChamberResult]:
+    """
+    Update the data folder with fresh data from
+    UPDATE_URL_DOWNLOAD_DEPUTES, UPDATE_URL_DOWNLOAD_SENAT and UPDATE_URL_DOWNLOAD_EUROPARL.
+    The chambers are updated concurrently, at most UPDATE_CONCURRENCY at the same time,
+    and the failure of one chamber does not stop the others.
+
+    Parameters:
+        downloader (Optional[Downloader]):
+            The downloader shared by every chamber.
+            If not given, one is opened for this update only.
+
+    Returns:
+        List[ChamberResult]: The result of the update of each chamber.
+    """
+    if downloader is None:
+        cache = DownloadCache(DOWNLOAD_CACHE_PATH) if DOWNLOAD_CACHE_ENABLED else None
+        async with Downloader(cache=cache) as own_downloader:
+            return await update_async(own_downloader)
+
+    logger.info("=== Update starting ===")
+
+    semaphore = asyncio.Semaphore(max(1, UPDATE_CONCURRENCY))
+    with record_update(UpdateReport()) as report:
+        results: List[ChamberResult] = await asyncio.gather(
+            *(
+                run_chamber(name, partial(update_chamber, name, downloader), semaphore)
+                for name in CHAMBERS
+            )
+        )
+        await update_index()
+    await write_report(report)
+
+    for result in results:
+        logger.info(
+            "%s : %s (%.2fs)",
+            result.name,
+            "success" if result.success else f"failed ({result.error})",
+            result.duration,
+        )
+
+    if all(result.success for result in results):
+        logger.info("=== Update success ===")
+    return results
 
 
 async def update() -> None:
     """Async version of update ot make it compatible with asyncio"""
     try:
-        await update_async()
+        with FileLock(UPDATE_LOCK_PATH):
+            results = await update_async()
+    except LockedError as e:
+        logger.error("=== Update skipped : %s ===", e)
+        return
     except Exception:
         logger.error("=== Update failed ===")
+        return
+    finally:
+        # One-shot run, the postgres pool is not reused afterwards
+        await close_pool()
+
+    if not all(result.success for result in results):
+        logger.error("=== Update failed ===")
@@ -1,7 +1,21 @@
+import argparse
 import asyncio
 
 from download.update import update
 
-
 if __name__ == "__main__":
-    asyncio.run(update())
+    parser = argparse.ArgumentParser(
+        description="Update the members of the french and european parliaments."
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and refresh each chamber on its own interval (DAEMON_INTERVAL_*)",
+    )
+    args = parser.parse_args()
+    if args.daemon:
+        from download.daemon import run_daemon
+
+        asyncio.run(run_daemon())
+    else:
+        asyncio.run(update())
@@ -0,0 +1,78 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from common.logger import logger
+from process.core import Elected
+
+MemberDict = Dict[str, Any]
+
+
+def read_snapshot(path: Path) -> Optional[Dict[str, MemberDict]]:
+    """
+    Reads the members of the previous run from their snapshot,
+    one [key, member] json array per line.
+
+    Returns:
+        Optional[Dict[str, MemberDict]]: The members by key, None if there is no usable snapshot.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {key: member for key, member in map(json.loads, f)}
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning("Cannot read the snapshot %s: %s", path, e)
+        return None
+
+
+def diff_member(old: MemberDict, new: Elected) -> Dict[str, Dict[str, Any]]:
+    """The fields whose value changed, with their old and new values."""
+    return {
+        name: {"old": old.get(name), "new": value}
+        for name, value in new.items()
+        if old.get(name) != value
+    }
+
+
+class Changeset:
+    """
+    Compares the members of a run, one at a time, with the members of the previous snapshot.
+    The members left in the previous snapshot once every member was compared were removed.
+    """
+
+    def __init__(self, previous: Dict[str, MemberDict]) -> None:
+        self._previous = previous
+        self.added: Dict[str, MemberDict] = {}
+        self.modified: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def compare(self, key: str, elected: Elected) -> None:
+        old = self._previous.pop(key, None)
+        if old is None:
+            self.added[key] = elected.to_dict()
+        else:
+            diff = diff_member(old, elected)
+            if diff:
+                self.modified[key] = diff
+
+    @property
+    def removed(self) -> Dict[str, MemberDict]:
+        return self._previous
+
+    def to_dict(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "metadata": {
+                **metadata,
+                "added": len(self.added),
+                "removed": len(self.removed),
+                "modified": len(self.modified),
+            },
+            "added": self.added,
+            "removed": self.removed,
+            "modified": self.modified,
+        }
@@ -0,0 +1,316 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Columnar representation of the members with pyarrow, when installed.
+The deputies are normalized with vectorized operations over whole columns,
+and the members of each chamber are exported to Parquet or Arrow IPC files.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, cast
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+from common.config import OUTPUT_COLUMNAR_FORMATS
+from common.logger import logger
+from process.core import ELECTED_FIELDS, Elected
+from process.mandate import ELECTION, MandateIndex
+from process.organe import OrganeIndex
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+for columnar_format in OUTPUT_COLUMNAR_FORMATS:
+    if columnar_format not in COLUMNAR_FORMATS:
+        raise ValueError(
+            f"Unknown columnar format {columnar_format}, expected {', '.join(COLUMNAR_FORMATS)}"
+        )
+
+if OUTPUT_COLUMNAR_FORMATS and pa is None:
+    logger.warning("pyarrow is not installed, the columnar outputs are disabled")
+
+# The columnar formats written, empty when they are disabled or pyarrow is missing
+COLUMNAR_FORMATS_USED: List[str] = OUTPUT_COLUMNAR_FORMATS if pa is not None else []
+
+
+def elected_table(records: Sequence[Elected]) -> pa.Table:
+    """The table of Elected records, one string column per field."""
+    return pa.table(
+        {
+            name: pa.array([getattr(record, name) for record in records], pa.string())
+            for name in ELECTED_FIELDS
+        }
+    )
+
+
+def elected_from_table(table: pa.Table) -> List[Elected]:
+    """The Elected records of the rows of a table built like elected_table."""
+    columns = [table.column(name).to_pylist() for name in ELECTED_FIELDS]
+    return [Elected(**dict(zip(ELECTED_FIELDS, values))) for values in zip(*columns)]
+
+
+def serialize_table(table: pa.Table, columnar_format: str) -> bytes:
+    """Serializes a table to a Parquet file or an Arrow IPC file."""
+    sink = pa.BufferOutputStream()
+    if columnar_format == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return cast(bytes, sink.getvalue().to_pybytes())
+
+
+def _scatter(parents: pa.Array, values: pa.Array, count: int) -> pa.Array:
+    """Places the value of each parent at its position, null for the parents without value."""
+    return pc.take(values, pc.index_in(pa.array(range(count), pa.int64()), parents))
+
+
+def _select_per_parent(
+    parents: pa.Array, mask: pa.Array, count: int, aggregation: str
+) -> pa.Array:
+    """
+    The position of the first (min) or last (max) child matching mask of each parent,
+    null for the parents without any.
+    """
+    children = pa.table(
+        {
+            "parent": pc.filter(parents, mask),
+            "position": pc.filter(pa.array(range(len(parents)), pa.int64()), mask),
+        }
+    )
+    selected = children.group_by("parent").aggregate([("position", aggregation)])
+    return _scatter(selected["parent"], selected[f"position_{aggregation}"], count)
+
+
+def _join(keys: pa.Array, uids: pa.Array, values: pa.Array) -> pa.Array:
+    """The value of the organe of each key, null when the key is null or unknown."""
+    return pc.take(values, pc.index_in(keys, uids))
+
+
+def _warn_missing(refs: pa.Array, keys: pa.Array, found: pa.Array) -> None:
+    """Logs the members whose organe is not referenced or not found, like Elected.from_deputy_json."""
+    for ref, key, is_found in zip(
+        refs.to_pylist(), keys.to_pylist(), found.to_pylist()
+    ):
+        if not key:
+            logger.warning("%s does not have any organe reference.", ref)
+        elif not is_found:
+            logger.warning("Cannot find the organe %s for %s", key, ref)
+
+
+class DeputyColumns:
+    """
+    The fields of a batch of trimmed acteur documents, flattened to columns:
+    one row per acteur, per mandat and per adresse, the last two with the row of their acteur.
+    """
+
+    def __init__(self, documents: Iterable[Any]) -> None:
+        self.refs: List[str] = []
+        self.civ: List[str] = []
+        self.last_name: List[str] = []
+        self.first_name: List[str] = []
+        # Row of the first mandat of each acteur
+        self.mandat_offset: List[int] = []
+        self.mandat_parent: List[int] = []
+        self.mandat_has_election: List[bool] = []
+        self.mandat_election: List[bool] = []
+        self.mandat_cause: List[Optional[str]] = []
+        self.mandat_causes: List[Optional[List[str]]] = []
+        self.mandat_departement_num: List[Optional[str]] = []
+        self.mandat_departement_name: List[Optional[str]] = []
+        self.mandat_circonscription_num: List[Optional[str]] = []
+        self.mandat_circonscription_ref: List[Optional[str]] = []
+        self.mandat_group: List[bool] = []
+        self.mandat_organe_ref: List[Optional[str]] = []
+        self.adresse_parent: List[int] = []
+        self.adresse_mail: List[bool] = []
+        self.adresse_value: List[Optional[str]] = []
+        for data in documents:
+            self.add(data)
+
+    def add(self, data: Any) -> None:
+        acteur = data["acteur"]
+        parent = len(self.refs)
+        self.refs.append(acteur["uid"]["#text"])
+        ident = acteur["etatCivil"]["ident"]
+        self.civ.append(ident["civ"])
+        self.last_name.append(ident["nom"])
+        self.first_name.append(ident["prenom"])
+
+        mandats = acteur["mandats"]["mandat"]
+        self.mandat_offset.append(len(self.mandat_parent))
+        for mandat in mandats if isinstance(mandats, list) else [mandats]:
+            election = mandat.get("election")
+            cause = election["causeMandat"] if election else None
+            lieu = (election.get("lieu") if election else None) or {}
+            organes = mandat.get("organes") or {}
+            organe_ref = organes.get("organeRef")
+            self.mandat_parent.append(parent)
+            self.mandat_has_election.append("election" in mandat)
+            self.mandat_election.append(bool(election))
+            self.mandat_cause.append(cause if isinstance(cause, str) else None)
+            self.mandat_causes.append(cause if isinstance(cause, list) else None)
+            self.mandat_departement_num.append(lieu.get("numDepartement"))
+            self.mandat_departement_name.append(lieu.get("departement"))
+            self.mandat_circonscription_num.append(lieu.get("numCirco"))
+            self.mandat_circonscription_ref.append(
+                election.get("refCirconscription") if election else None
+            )
+            self.mandat_group.append(mandat.get("typeOrgane") == "GP")
+            self.mandat_organe_ref.append(
+                organe_ref if isinstance(organe_ref, str) else None
+            )
+
+        adresses = acteur["adresses"]["adresse"]
+        for adresse in adresses if isinstance(adresses, list) else [adresses]:
+            self.adresse_parent.append(parent)
+            self.adresse_mail.append(adresse["@xsi:type"] == "AdresseMail_Type")
+            self.adresse_value.append(adresse.get("valElec"))
+
+
+def deputies_table(
+    documents: Iterable[Any],
+    organes: OrganeIndex,
+    mandates: Optional[MandateIndex] = None,
+) -> pa.Table:
+    """
+    Builds the table of the deputies of a batch of trimmed acteur documents,
+    with the rules of Elected.from_deputy_json applied to whole columns.
+    """
+    columns = DeputyColumns(documents)
+    count = len(columns.refs)
+    refs = pa.array(columns.refs, pa.string())
+    empty = pa.scalar("", pa.string())
+
+    # The election of the deputy: the first one caused by the general elections,
+    # otherwise the last mandat with an election field
+    parents = pa.array(columns.mandat_parent, pa.int64())
+    if mandates is not None and all(ref in mandates.elections for ref in columns.refs):
+        # Found by the mandate index when the acteurs were indexed
+        election = pa.array(
+            [
+                None if position is None else offset + position
+                for offset, position in zip(
+                    columns.mandat_offset,
+                    (mandates.elections[ref] for ref in columns.refs),
+                )
+            ],
+            pa.int64(),
+        )
+    else:
+        cause = pa.array(columns.mandat_cause, pa.string())
+        causes = pa.array(columns.mandat_causes, pa.list_(pa.string()))
+        listed = pc.unique(
+            pc.filter(
+                pc.list_parent_indices(causes),
+                pc.equal(pc.list_flatten(causes), ELECTION),
+            )
+        )
+        general = pc.or_kleene(
+            pc.fill_null(pc.equal(pc.utf8_lower(cause), ELECTION), False),
+            pc.is_in(pa.array(range(len(parents)), pa.int64()), listed),
+        )
+        matching = pc.and_(pa.array(columns.mandat_election, pa.bool_()), general)
+        election = pc.coalesce(
+            _select_per_parent(parents, matching, count, "min"),
+            _select_per_parent(
+                parents,
+                pa.array(columns.mandat_has_election, pa.bool_()),
+                count,
+                "max",
+            ),
+        )
+    elected = pc.fill_null(
+        pc.take(pa.array(columns.mandat_election, pa.bool_()), election), False
+    )
+
+    def from_election(values: List[Optional[str]]) -> pa.Array:
+        return pc.if_else(
+            elected, pc.take(pa.array(values, pa.string()), election), empty
+        )
+
+    departement_num = from_election(columns.mandat_departement_num)
+    departement_name = from_election(columns.mandat_departement_name)
+    circonscription_num = from_election(columns.mandat_circonscription_num)
+    circonscription_num = pc.if_else(
+        pc.equal(pc.utf8_length(circonscription_num), 1),
+        pc.utf8_lpad(circonscription_num, 2, "0"),
+        circonscription_num,
+    )
+    circonscription_code = pc.if_else(
+        elected,
+        pc.binary_join_element_wise(departement_num, circonscription_num, ""),
+        empty,
+    )
+    circonscription_ref = pc.if_else(
+        elected,
+        pc.take(pa.array(columns.mandat_circonscription_ref, pa.string()), election),
+        pa.scalar(None, pa.string()),
+    )
+
+    # The first group mandat of the deputy
+    group_ref = pc.take(
+        pa.array(columns.mandat_organe_ref, pa.string()),
+        _select_per_parent(
+            parents, pa.array(columns.mandat_group, pa.bool_()), count, "min"
+        ),
+    )
+
+    uids = pa.array(list(organes.organes), pa.string())
+    libelles = pa.array(
+        [organe.libelle for organe in organes.organes.values()], pa.string()
+    )
+    libelles_abreges = pa.array(
+        [organe.libelle_abrege for organe in organes.organes.values()], pa.string()
+    )
+    circonscription_name = _join(circonscription_ref, uids, libelles)
+    group_abv = _join(group_ref, uids, libelles_abreges)
+    group_name = _join(group_ref, uids, libelles)
+
+    circonscription_found = pc.is_valid(circonscription_name)
+    group_found = pc.is_valid(group_name)
+    for keys, found in (
+        (circonscription_ref, circonscription_found),
+        (group_ref, group_found),
+    ):
+        referenced = pc.sum(pc.is_valid(keys)).as_py() or 0
+        hits = pc.sum(found).as_py() or 0
+        organes.hits += hits
+        organes.misses += referenced - hits
+    _warn_missing(refs, circonscription_ref, circonscription_found)
+    _warn_missing(refs, group_ref, group_found)
+
+    # The last mail adresse of the deputy
+    email = pc.take(
+        pa.array(columns.adresse_value, pa.string()),
+        _select_per_parent(
+            pa.array(columns.adresse_parent, pa.int64()),
+            pa.array(columns.adresse_mail, pa.bool_()),
+            count,
+            "max",
+        ),
+    )
+
+    fields: Dict[str, pa.Array] = {
+        "ref": refs,
+        "civ": pa.array(columns.civ, pa.string()),
+        "last_name": pa.array(columns.last_name, pa.string()),
+        "first_name": pa.array(columns.first_name, pa.string()),
+        "email": pc.fill_null(email, ""),
+        "departement_num": departement_num,
+        "departement_name": departement_name,
+        "circonscription_num": circonscription_num,
+        "circonscription_name": pc.fill_null(circonscription_name, ""),
+        "circonscription_code": circonscription_code,
+        "country": pa.array(["France"] * count, pa.string()),
+        "group_abv": pc.fill_null(group_abv, ""),
+        "group_name": pc.fill_null(group_name, ""),
+    }
+    return pa.table({name: fields[name] for name in ELECTED_FIELDS})
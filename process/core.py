@@ -2,36 +2,41 @@
 # See LICENSE file for extended copyright information.
 # This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
 
-from typing import Any, Dict, List, Optional, Self, Union
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Self, Tuple, Union
 
-from attrs import define
-from pathlib import Path
+from attrs import field, fields, frozen
 
 from common.logger import logger
-from download.core import read_json
+from process.mandate import MandateIndex, select_election
+from process.organe import OrganeIndex
 
 
-ELECTION = "\u00e9lections g\u00e9n\u00e9rales"
+def intern_value(value: Optional[str]) -> Optional[str]:
+    """Interns a value shared by many members, so that it is stored only once."""
+    return sys.intern(value) if isinstance(value, str) else value
 
 
-@define
+@frozen
 class Elected:
     ref: str
-    civ: str
+    civ: str = field(converter=intern_value)
     last_name: str
     first_name: str
     email: str
-    departement_num: str
-    departement_name: str
-    circonscription_num: str
+    departement_num: str = field(converter=intern_value)
+    departement_name: str = field(converter=intern_value)
+    circonscription_num: str = field(converter=intern_value)
     circonscription_name: str
     circonscription_code: str
-    country: str
-    group_abv: str
-    group_name: str
+    country: str = field(converter=intern_value)
+    group_abv: str = field(converter=intern_value)
+    group_name: str = field(converter=intern_value)
 
     @classmethod
-    async def from_deputy_json(cls, data: Any, organe_folder: Path) -> Self:
+    def from_deputy_json(
+        cls, data: Any, organes: OrganeIndex, mandates: Optional[MandateIndex] = None
+    ) -> Self:
         ref: str = data["acteur"]["uid"]["#text"]
         last_name: str = data["acteur"]["etatCivil"]["ident"]["nom"]
         civ: str = data["acteur"]["etatCivil"]["ident"]["civ"]
@@ -48,23 +53,17 @@ class Elected:
         circonscription_num: str = ""
         circonscription_name: str = ""
         circonscription_code: str = ""
-        elec_found: bool = False
 
         try:
+            # The election mandat was found by the mandate index when the acteur was indexed
+            position = (
+                mandates.election(ref, mandats)
+                if mandates is not None
+                else select_election(mandats)
+            )
+            if position is not None:
+                elec = mandats[position]["election"]
             for mandat in mandats:
-                if not elec_found and "election" in mandat:
-                    elec = mandat["election"]
-                    if elec:
-                        if (
-                            isinstance(elec["causeMandat"], list)
-                            and ELECTION in elec["causeMandat"]
-                        ):
-                            elec_found = True
-                        elif (
-                            isinstance(elec["causeMandat"], str)
-                            and ELECTION == elec["causeMandat"].lower()
-                        ):
-                            elec_found = True
                 if (
                     not group_ref
                     and "typeOrgane" in mandat
@@ -87,13 +86,12 @@ class Elected:
                 circonscription_code = f"{departement_num}{circonscription_num}"
 
             if circonscription_ref:
-                organe_file = organe_folder / f"{circonscription_ref}.json"
-                try:
-                    circonscription_data = await read_json(organe_file)
-                    circonscription_name = circonscription_data["organe"]["libelle"]
-                except OSError:
+                circonscription = organes.get(circonscription_ref)
+                if circonscription is not None:
+                    circonscription_name = circonscription.libelle
+                else:
                     logger.warning(
-                        "Cannot find the organe file %s for %s",
+                        "Cannot find the organe %s for %s",
                         circonscription_ref,
                         ref,
                     )
@@ -101,14 +99,13 @@ class Elected:
                 logger.warning("%s does not have any organe reference.", ref)
 
             if group_ref:
-                organe_file = organe_folder / f"{group_ref}.json"
-                try:
-                    group_data = await read_json(organe_file)
-                    group_abv = group_data["organe"]["libelleAbrege"]
-                    group_name = group_data["organe"]["libelle"]
-                except OSError:
+                group = organes.get(group_ref)
+                if group is not None:
+                    group_abv = group.libelle_abrege
+                    group_name = group.libelle
+                else:
                     logger.warning(
-                        "Cannot find the organe file %s for %s", group_ref, ref
+                        "Cannot find the organe %s for %s", group_ref, ref
                     )
             else:
                 logger.warning("%s does not have any organe reference.", ref)
@@ -148,69 +145,70 @@ class Elected:
         )
 
     @classmethod
-    async def from_senat(cls, data: Any) -> Self:
-        ref: str = data["senmat"]
-        last_name: str = data["sennomuse"]
-        civ: str = data["quacod"]
-        first_name: str = data["senprenomuse"]
-
-        group_abv: str = data["grppolcod"]
-        group_name: str = data["grppollilcou"]
-        departement_num: str = data["dptcod"]
-        departement_name: str = data["dptlib"]
-        circonscription_num: str = ""
-        circonscription_name: str = ""
-        circonscription_code: str = ""
-        email: str = data["senema"]
+    def from_deputy_jsons(
+        cls,
+        documents: Iterable[Any],
+        organes: OrganeIndex,
+        mandates: Optional[MandateIndex] = None,
+    ) -> List[Self]:
+        """Builds the deputies of a batch of acteur documents, see from_deputy_json."""
+        return [cls.from_deputy_json(data, organes, mandates) for data in documents]
 
-        return cls(
-            ref=ref,
-            civ=civ,
-            last_name=last_name,
-            first_name=first_name,
-            email=email,
-            departement_num=departement_num,
-            departement_name=departement_name,
-            circonscription_num=circonscription_num,
-            circonscription_name=circonscription_name,
-            circonscription_code=circonscription_code,
-            country="France",
-            group_abv=group_abv,
-            group_name=group_name,
-        )
+    @classmethod
+    def from_senat(cls, data: Any) -> Self:
+        return cls.from_senat_rows((data,))[0]
 
     @classmethod
-    async def from_europarl_csv(cls, data: Any) -> Self:
-        ref: str = data["mep_identifier"]
-        last_name: str = data["mep_family_name"]
-        civ: str = data["mep_honorific_prefix"]
-        first_name: str = data["mep_given_name"]
+    def from_senat_rows(cls, rows: Iterable[Any]) -> List[Self]:
+        """Builds the senators of a batch of rows of the active senators query."""
+        return [
+            cls(
+                ref=data["senmat"],
+                civ=data["quacod"],
+                last_name=data["sennomuse"],
+                first_name=data["senprenomuse"],
+                email=data["senema"],
+                departement_num=data["dptcod"],
+                departement_name=data["dptlib"],
+                circonscription_num="",
+                circonscription_name="",
+                circonscription_code="",
+                country="France",
+                group_abv=data["grppolcod"],
+                group_name=data["grppollilcou"],
+            )
+            for data in rows
+        ]
 
-        group_abv: str = ""
-        group_name: str = data["mep_political_group"]
-        departement_num: str = ""
-        departement_name: str = ""
-        circonscription_num: str = ""
-        circonscription_name: str = ""
-        circonscription_code: str = ""
-        country: str = data["mep_country_of_representation"]
-        email: str = data["mep_email"]
+    @classmethod
+    def from_europarl_csv(cls, data: Any) -> Self:
+        return cls.from_europarl_rows((data,))[0]
 
-        return cls(
-            ref=ref,
-            civ=civ,
-            last_name=last_name,
-            first_name=first_name,
-            email=email,
-            departement_num=departement_num,
-            departement_name=departement_name,
-            circonscription_num=circonscription_num,
-            circonscription_name=circonscription_name,
-            circonscription_code=circonscription_code,
-            country=country,
-            group_abv=group_abv,
-            group_name=group_name,
-        )
+    @classmethod
+    def from_europarl_rows(cls, rows: Iterable[Any]) -> List[Self]:
+        """Builds the members of the european parliament of a batch of csv rows."""
+        return [
+            cls(
+                ref=data["mep_identifier"],
+                civ=data["mep_honorific_prefix"],
+                last_name=data["mep_family_name"],
+                first_name=data["mep_given_name"],
+                email=data["mep_email"],
+                departement_num="",
+                departement_name="",
+                circonscription_num="",
+                circonscription_name="",
+                circonscription_code="",
+                country=data["mep_country_of_representation"],
+                group_abv="",
+                group_name=data["mep_political_group"],
+            )
+            for data in rows
+        ]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """The fields and their values, sorted by name like in the output files."""
+        return [(name, getattr(self, name)) for name in ELECTED_FIELDS]
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -228,3 +226,9 @@ class Elected:
             "group_abv": self.group_abv,
             "group_name": self.group_name,
         }
+
+
+# Names of the fields of Elected, sorted like in the output files
+ELECTED_FIELDS: Tuple[str, ...] = tuple(
+    sorted(attribute.name for attribute in fields(Elected))
+)
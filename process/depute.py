@@ -3,43 +3,166 @@
 # This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
 from __future__ import annotations
 
+import asyncio
+import json
+from collections import deque
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Deque, List, Optional
 
-import aiofiles
-import yaml
-
-from common.config import OUTPUT_FOLDER
+from common.config import PARSE_BATCH_SIZE, PIPELINE_BUILD_WORKERS
 from common.logger import logger
-from download.core import read_jsons_from_directory
+from common.metrics import stage, stage_metrics
+from download.core import JsonZipArchive, parse_window
+from process.columnar import COLUMNAR_FORMATS_USED, deputies_table, elected_from_table
 from process.core import Elected
+from process.mandate import MandateIndex, SeatConflict
+from process.organe import OrganeIndex
+from process.output import (
+    Member,
+    conflicts_path,
+    file_size,
+    fsync_directory,
+    output_path,
+    write_atomically,
+)
+from process.pipeline import Pipeline, Stage, batched, write_members
+from process.schema import ACTEUR_SCHEMA, trim_acteur
 
+DEPUTIES_OUTPUT_NAME = "deputies"
+DEPUTIES_OUTPUT_FILE: Path = output_path(DEPUTIES_OUTPUT_NAME)
 
-async def process_file_deputy_async(acteur_folder: Path, organe_folder: Path) -> None:
-    logger.info("Processing deputies files in %s", acteur_folder)
+# Folders of the acteur and organe files in the AMO10 zip
+ACTEUR_FOLDER = "json/acteur/"
+ORGANE_FOLDER = "json/organe/"
 
-    deputies: List[Elected] = []
 
-    async for data in read_jsons_from_directory(acteur_folder):
-        deputies.append(await Elected.from_deputy_json(data, organe_folder))
+def read_conflicts(path: Path) -> Optional[List[Any]]:
+    """The conflicts of a conflicts file, None when it is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            conflicts = json.load(f).get("conflicts")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return conflicts if isinstance(conflicts, list) else None
 
-    deputies_dict: Dict[str, Any] = {
-        deputy.circonscription_code: deputy.to_dict() for deputy in deputies
-    }
 
-    output: Dict[str, Any] = {
+def save_conflicts(path: Path, conflicts: List[SeatConflict]) -> None:
+    """
+    Writes the conflicts file, only when its conflicts changed since the previous run,
+    so its last_updated only changes with them. Without any conflict, the file is removed.
+    """
+    if not conflicts:
+        if path.exists():
+            path.unlink()
+            fsync_directory(path.parent)
+            logger.info("No seat conflict left, removed %s", path)
+        return
+    # Compared as read back from json, e.g. tuples become lists
+    items = json.loads(json.dumps([conflict.to_dict() for conflict in conflicts]))
+    if read_conflicts(path) == items:
+        logger.info("Seat conflicts unchanged, kept %s", path)
+        return
+    content = {
         "metadata": {
             "last_updated": datetime.now().isoformat(),
-            "count": len(deputies_dict),
+            "count": len(items),
         },
-        "members": deputies_dict,
+        "conflicts": items,
     }
+    write_atomically(path, json.dumps(content, ensure_ascii=False, indent=2) + "\n")
+
+
+async def write_conflicts(conflicts: List[SeatConflict]) -> None:
+    """Writes the seats claimed by several deputies, replacing the ones of the previous run."""
+    await asyncio.to_thread(
+        save_conflicts, conflicts_path(DEPUTIES_OUTPUT_NAME), conflicts
+    )
+
+
+async def build_deputies(
+    archive: JsonZipArchive, organes: OrganeIndex, mandates: MandateIndex
+) -> Deque[List[Elected]]:
+    """
+    Parses every acteur of the archive, indexing its mandat then building its deputy.
+    This is not streamed: every deputy of the archive is built and kept in memory,
+    since a seat can only be resolved once every acteur is indexed.
+    Only the acteur documents are dropped, once their deputies are built.
+
+    Returns:
+        Deque[List[Elected]]: The deputies by batch, in the order of their acteur files.
+    """
+    batches: Deque[List[Elected]] = deque()
+
+    def index(documents: List[Any]) -> List[Any]:
+        mandates.add_acteurs(documents)
+        return documents
+
+    def build(documents: List[Any]) -> List[Elected]:
+        if COLUMNAR_FORMATS_USED:
+            # The member set is kept as columns anyway, normalize it as columns
+            return elected_from_table(deputies_table(documents, organes, mandates))
+        return Elected.from_deputy_jsons(documents, organes, mandates)
+
+    stage_metrics("parse").bytes_in += file_size(archive.path)
+    await Pipeline(
+        batched(archive.names(ACTEUR_FOLDER), PARSE_BATCH_SIZE),
+        [
+            Stage(
+                "parse",
+                partial(archive.parse_batch, trim=trim_acteur, schema=ACTEUR_SCHEMA),
+                workers=parse_window(),
+            ),
+            # One batch at a time, the acteurs of a batch are indexed before it is built
+            Stage("mandates", index, records="input"),
+            Stage(
+                "build",
+                build,
+                workers=PIPELINE_BUILD_WORKERS,
+                thread=PIPELINE_BUILD_WORKERS > 1,
+            ),
+            Stage("collect", batches.append, records=None),
+        ],
+    ).run()
+    return batches
+
+
+def seated_deputies(deputies: List[Elected], mandates: MandateIndex) -> List[Member]:
+    """The deputies of a batch holding their seat, keyed by their seat."""
+    return [
+        (deputy.circonscription_code, deputy)
+        for deputy in deputies
+        if mandates.holds_seat(deputy)
+    ]
+
+
+async def process_file_deputy_async(deputies_zip: Path) -> None:
+    """
+    Streams the deputies of the AMO10 zip to the output files, in the order of their acteur files.
+    Every acteur is parsed and its mandat indexed before the deputies are written,
+    so that a seat claimed by several acteurs goes to its current holder only:
+    the deputies are fully materialized first, then streamed to the output files.
+    """
+    logger.info("Processing deputies files in %s", deputies_zip)
+
+    mandates = MandateIndex()
+    with JsonZipArchive(deputies_zip) as archive:
+        with stage("organes") as metrics:
+            organes = await OrganeIndex.from_archive(archive, ORGANE_FOLDER)
+            metrics.records += len(organes)
+        batches = await build_deputies(archive, organes, mandates)
+
+    with stage("mandates"):
+        conflicts = mandates.resolve()
+    await write_conflicts(conflicts)
 
-    async with aiofiles.open(
-        OUTPUT_FOLDER / "deputies.yaml", mode="w+", encoding="utf-8"
-    ) as f:
-        await f.write(yaml.dump(output))
-        await f.flush()
+    await write_members(
+        DEPUTIES_OUTPUT_NAME,
+        # Each batch is released once written
+        (batches.popleft() for _ in range(len(batches))),
+        [Stage("seats", partial(seated_deputies, mandates=mandates))],
+    )
+    organes.log_stats()
 
     logger.info("Process deputies done")
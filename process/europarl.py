@@ -3,43 +3,46 @@
 # This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
 from __future__ import annotations
 
-from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
-import aiofiles
-import yaml
-
-from common.config import OUTPUT_FOLDER
+from common.config import PIPELINE_BUILD_WORKERS
 from common.logger import logger
-from download.core import read_csv
+from common.metrics import timed_iter
+from download.core import read_csv_batches
 from process.core import Elected
+from process.output import Member, file_size, output_path
+from process.pipeline import Stage, write_members
 
+EUROPARL_OUTPUT_NAME = "europarl"
+EUROPARL_OUTPUT_FILE: Path = output_path(EUROPARL_OUTPUT_NAME)
 
-async def process_file_europarl_async(europarl_file: Path) -> None:
-    logger.info("Processing europarl file %s", europarl_file)
-
-    europarldeps: List[Elected] = []
 
-    for data in await read_csv(europarl_file):
-        europarldeps.append(await Elected.from_europarl_csv(data))
+def build_europarl(rows: List[Dict[str, Any]]) -> List[Member]:
+    """The members of the european parliament of a chunk of csv rows, keyed by their ref."""
+    return [
+        (europarldep.ref, europarldep)
+        for europarldep in Elected.from_europarl_rows(rows)
+    ]
 
-    europarldeps_dict: Dict[str, Any] = {
-        europarldep.ref: europarldep.to_dict() for europarldep in europarldeps
-    }
 
-    output: Dict[str, Any] = {
-        "metadata": {
-            "last_updated": datetime.now().isoformat(),
-            "count": len(europarldeps_dict),
-        },
-        "members": europarldeps_dict,
-    }
+async def process_file_europarl_async(europarl_file: Path) -> None:
+    """Streams the members of the european parliament csv file to the output files, by chunk of the file."""
+    logger.info("Processing europarl file %s", europarl_file)
 
-    async with aiofiles.open(
-        OUTPUT_FOLDER / "europarl.yaml", mode="w+", encoding="utf-8"
-    ) as f:
-        await f.write(yaml.dump(output))
-        await f.flush()
+    await write_members(
+        EUROPARL_OUTPUT_NAME,
+        timed_iter(
+            "parse", read_csv_batches(europarl_file), bytes_in=file_size(europarl_file)
+        ),
+        [
+            Stage(
+                "build",
+                build_europarl,
+                workers=PIPELINE_BUILD_WORKERS,
+                thread=PIPELINE_BUILD_WORKERS > 1,
+            ),
+        ],
+    )
 
     logger.info("Process europarl done")
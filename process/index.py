@@ -0,0 +1,213 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+SQLite index of the members of every chamber, built from their published snapshots,
+and the lookup API on top of it.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+from common.config import OUTPUT_INDEX_PATH
+from common.logger import logger
+from process.changeset import read_snapshot
+from process.core import ELECTED_FIELDS, Elected
+from process.output import fsync_directory, snapshot_path
+
+# Columns of the elected table, the chamber and the output key of the member first
+INDEX_COLUMNS = ("chamber", "key") + ELECTED_FIELDS
+
+INDEXED_COLUMNS = ("ref", "circonscription_code", "departement_num", "group_abv")
+
+
+def index_is_stale(chambers: Iterable[str], path: Path = OUTPUT_INDEX_PATH) -> bool:
+    """Whether the index is missing or older than the snapshot of a chamber."""
+    try:
+        built = path.stat().st_mtime
+    except FileNotFoundError:
+        return True
+    return any(
+        snapshot.exists() and snapshot.stat().st_mtime > built
+        for snapshot in (snapshot_path(chamber) for chamber in chambers)
+    )
+
+
+def build_index(chambers: Iterable[str], path: Path = OUTPUT_INDEX_PATH) -> int:
+    """
+    Builds the index from the snapshots of the chambers in a fresh file, then renames it over path.
+    Connections opened on the previous index keep reading it until they are closed,
+    so readers never wait for a rebuild.
+
+    Parameters:
+        chambers (Iterable[str]): The output names of the chambers, e.g. "deputies".
+        path (Path): The index file.
+
+    Returns:
+        int: The number of members indexed.
+    """
+    temp_path = path.with_name(f"{path.name}.tmp")
+    temp_path.unlink(missing_ok=True)
+    count = 0
+
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute(
+            f"CREATE TABLE elected ({', '.join(f'{column} TEXT' for column in INDEX_COLUMNS)}, "
+            "PRIMARY KEY (chamber, key))"
+        )
+        insert = (
+            f"INSERT INTO elected ({', '.join(INDEX_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in INDEX_COLUMNS)})"
+        )
+        for chamber in chambers:
+            members = read_snapshot(snapshot_path(chamber))
+            if members is None:
+                logger.warning("No snapshot of %s, not indexed", chamber)
+                continue
+            conn.executemany(
+                insert,
+                (
+                    (chamber, key, *(member.get(name) for name in ELECTED_FIELDS))
+                    for key, member in members.items()
+                ),
+            )
+            count += len(members)
+
+        for column in INDEXED_COLUMNS:
+            conn.execute(f"CREATE INDEX elected_{column} ON elected ({column})")
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE elected_names USING fts5("
+                "last_name, first_name, content='elected', "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+            conn.execute(
+                "INSERT INTO elected_names (rowid, last_name, first_name) "
+                "SELECT rowid, last_name, first_name FROM elected"
+            )
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5, the name search falls back to a prefix scan
+            logger.warning("Cannot create the full-text index of the names: %s", e)
+        conn.commit()
+    finally:
+        conn.close()
+
+    with open(temp_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    fsync_directory(path.parent)
+    logger.info("Indexed %d members in %s", count, path)
+    return count
+
+
+def refresh_index(chambers: Iterable[str], path: Path = OUTPUT_INDEX_PATH) -> bool:
+    """Rebuilds the index if a chamber published new members since it was built."""
+    chambers = list(chambers)
+    if not index_is_stale(chambers, path):
+        logger.info("Index %s is up to date", path)
+        return False
+    build_index(chambers, path)
+    return True
+
+
+def _fts_query(prefix: str) -> str:
+    """A full-text query matching the names starting with each word of prefix."""
+    return " ".join(
+        '"' + word.replace('"', '""') + '"*' for word in prefix.split() if word
+    )
+
+
+class ElectedIndex:
+    """
+    Read-only lookups in the index of the members.
+    A rebuild replaces the file: open a new ElectedIndex to see it.
+    Use it as a context manager, or call close when done.
+
+    Parameters:
+        path (Path): The index file.
+    """
+
+    def __init__(self, path: Path = OUTPUT_INDEX_PATH) -> None:
+        self.path = path
+        self._conn = sqlite3.connect(
+            f"{path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self.has_names = (
+            self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'elected_names'"
+            ).fetchone()
+            is not None
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> ElectedIndex:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _select(
+        self, where: str, parameters: List[Any], chamber: Optional[str]
+    ) -> List[Elected]:
+        if chamber is not None:
+            where += " AND chamber = ?"
+            parameters.append(chamber)
+        rows = self._conn.execute(
+            f"SELECT {', '.join(ELECTED_FIELDS)} FROM elected WHERE {where} "
+            "ORDER BY chamber, key",
+            parameters,
+        )
+        return [Elected(**dict(row)) for row in rows]
+
+    def by_ref(self, ref: str, chamber: Optional[str] = None) -> List[Elected]:
+        return self._select("ref = ?", [ref], chamber)
+
+    def by_circonscription(self, circonscription_code: str) -> List[Elected]:
+        return self._select("circonscription_code = ?", [circonscription_code], None)
+
+    def by_departement(
+        self, departement_num: str, chamber: Optional[str] = None
+    ) -> List[Elected]:
+        return self._select("departement_num = ?", [departement_num], chamber)
+
+    def by_group(self, group_abv: str, chamber: Optional[str] = None) -> List[Elected]:
+        return self._select("group_abv = ?", [group_abv], chamber)
+
+    def search_name(
+        self, prefix: str, chamber: Optional[str] = None, limit: int = 20
+    ) -> List[Elected]:
+        """
+        The members whose last or first name start with each word of prefix,
+        ignoring case and accents when the full-text index is available.
+        """
+        query = _fts_query(prefix)
+        if not query:
+            return []
+        if not self.has_names:
+            return self._select(
+                "(last_name LIKE ? OR first_name LIKE ?)",
+                [f"{prefix}%", f"{prefix}%"],
+                chamber,
+            )[:limit]
+
+        where = "elected_names MATCH ?"
+        parameters: List[Any] = [query]
+        if chamber is not None:
+            where += " AND elected.chamber = ?"
+            parameters.append(chamber)
+        parameters.append(limit)
+        rows = self._conn.execute(
+            f"SELECT {', '.join(f'elected.{name}' for name in ELECTED_FIELDS)} "
+            "FROM elected_names JOIN elected ON elected.rowid = elected_names.rowid "
+            f"WHERE {where} ORDER BY rank LIMIT ?",
+            parameters,
+        )
+        return [Elected(**dict(row)) for row in rows]
@@ -0,0 +1,243 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Index of the deputy mandats of the acteurs, built in one pass over their documents,
+and of the seats they hold, keyed by circonscription code.
+A seat claimed by several acteurs, e.g. a deputy and the substitute who replaced them,
+is given to its current holder and reported as a conflict.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from attrs import frozen
+
+from common.logger import logger
+
+if TYPE_CHECKING:
+    from process.core import Elected
+
+ELECTION = "élections générales"
+
+
+def is_general_election(election: Any) -> bool:
+    """Whether the election of a mandat is the general elections."""
+    if not election:
+        return False
+    cause = election["causeMandat"]
+    if isinstance(cause, list):
+        return ELECTION in cause
+    return isinstance(cause, str) and ELECTION == cause.lower()
+
+
+def select_election(mandats: List[Any]) -> Optional[int]:
+    """
+    The position of the mandat describing the deputy in the mandats of an acteur:
+    the first one elected in the general elections, otherwise the last one with an election field.
+    """
+    position: Optional[int] = None
+    for index, mandat in enumerate(mandats):
+        if "election" in mandat:
+            position = index
+            if is_general_election(mandat["election"]):
+                return index
+    return position
+
+
+def circonscription_code(departement_num: str, circonscription_num: str) -> str:
+    """The code of a seat, the departement number then the circonscription number on two digits."""
+    if len(circonscription_num) == 1:
+        circonscription_num = "0" + circonscription_num
+    return f"{departement_num}{circonscription_num}"
+
+
+def current_suppleant(suppleants: Any) -> Optional[str]:
+    """The acteur ref of the current substitute of a mandat, the last one if none is current."""
+    suppleant = (suppleants or {}).get("suppleant")
+    if isinstance(suppleant, list):
+        current = [item for item in suppleant if not item.get("dateFin")]
+        suppleant = (current or suppleant)[-1] if suppleant else None
+    return suppleant.get("suppleantRef") if suppleant else None
+
+
+@frozen
+class Mandate:
+    """The deputy mandat of an acteur, holding the seat circonscription_code."""
+
+    uid: str
+    acteur_ref: str
+    circonscription_code: str
+    # Dates of the mandat, iso formatted, end is None while the mandat goes on
+    start: str
+    end: Optional[str]
+    # The uid of the mandat this one took over, e.g. from the deputy a substitute replaced
+    replaced_ref: Optional[str]
+    suppleant_ref: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uid": self.uid,
+            "acteur_ref": self.acteur_ref,
+            "start": self.start,
+            "end": self.end,
+            "replaced_ref": self.replaced_ref,
+            "suppleant_ref": self.suppleant_ref,
+        }
+
+
+@frozen
+class SeatConflict:
+    """A seat claimed by several mandates, the others with the reason they lost it."""
+
+    circonscription_code: str
+    holder: Mandate
+    others: Tuple[Tuple[Mandate, str], ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "circonscription_code": self.circonscription_code,
+            "holder": self.holder.to_dict(),
+            "others": [
+                {**mandate.to_dict(), "reason": reason}
+                for mandate, reason in self.others
+            ],
+        }
+
+
+class MandateIndex:
+    """
+    The deputy mandats of the acteurs, by acteur and by seat.
+    Add every acteur, then resolve the seats: each seat then has one holder,
+    and the deputies look up their election mandat and their seat without scanning their mandats.
+    """
+
+    def __init__(self) -> None:
+        # Position of the election mandat of each acteur, None if it has none
+        self.elections: Dict[str, Optional[int]] = {}
+        self.seats: Dict[str, List[Mandate]] = {}
+        self.holders: Dict[str, Mandate] = {}
+        self.conflicts: List[SeatConflict] = []
+
+    def __len__(self) -> int:
+        return len(self.elections)
+
+    def add_acteur(self, data: Any) -> None:
+        """
+        Indexes the election mandat of an acteur document.
+        A malformed document is left out, its deputy then reports what is missing.
+        """
+        try:
+            ref: str = data["acteur"]["uid"]["#text"]
+            mandats = data["acteur"]["mandats"]["mandat"]
+            mandats = mandats if isinstance(mandats, list) else [mandats]
+            position = select_election(mandats)
+        except (KeyError, TypeError, AttributeError):
+            return
+        self.elections[ref] = position
+        if position is None:
+            return
+
+        mandat = mandats[position]
+        election = mandat["election"]
+        try:
+            lieu = election["lieu"]
+            code = circonscription_code(lieu["numDepartement"], lieu["numCirco"])
+        except (KeyError, TypeError):
+            return
+        mandature = mandat.get("mandature") or {}
+        self.seats.setdefault(code, []).append(
+            Mandate(
+                uid=mandat.get("uid") or "",
+                acteur_ref=ref,
+                circonscription_code=code,
+                start=mandat.get("dateDebut") or "",
+                end=mandat.get("dateFin"),
+                replaced_ref=mandature.get("mandatRemplaceRef"),
+                suppleant_ref=current_suppleant(mandat.get("suppleants")),
+            )
+        )
+
+    def add_acteurs(self, documents: Iterable[Any]) -> None:
+        for data in documents:
+            self.add_acteur(data)
+
+    def election(self, ref: str, mandats: List[Any]) -> Optional[int]:
+        """The position of the election mandat of an acteur, scanned only if it was not indexed."""
+        try:
+            return self.elections[ref]
+        except KeyError:
+            return select_election(mandats)
+
+    def resolve(self) -> List[SeatConflict]:
+        """
+        Gives each seat to its current holder. Among the mandates of a seat,
+        the ones taken over by another mandate (mandatRemplaceRef) or by their own substitute are left out,
+        then an ongoing mandate wins over an ended one, then the latest started,
+        then the first one in the order of the documents.
+
+        Returns:
+            List[SeatConflict]: The seats claimed by several mandates.
+        """
+        self.holders = {}
+        self.conflicts = []
+        for code, mandates in self.seats.items():
+            if len(mandates) == 1:
+                self.holders[code] = mandates[0]
+                continue
+
+            replaced = {
+                mandate.replaced_ref for mandate in mandates if mandate.replaced_ref
+            }
+            acteurs = {mandate.acteur_ref: mandate for mandate in mandates}
+            substituted = {
+                mandate.uid
+                for mandate in mandates
+                if mandate.suppleant_ref in acteurs
+                and acteurs[mandate.suppleant_ref].start >= mandate.start
+            }
+            candidates = [
+                mandate
+                for mandate in mandates
+                if mandate.uid not in replaced and mandate.uid not in substituted
+            ] or mandates
+            # max keeps the first of the mandates ranked the same
+            holder = max(
+                candidates, key=lambda mandate: (mandate.end is None, mandate.start)
+            )
+            self.holders[code] = holder
+
+            others: List[Tuple[Mandate, str]] = []
+            for mandate in mandates:
+                if mandate is holder:
+                    continue
+                if mandate.uid in replaced:
+                    reason = "replaced"
+                elif mandate.uid in substituted:
+                    reason = "substituted"
+                elif mandate.end is not None and holder.end is None:
+                    reason = "ended"
+                elif mandate.start < holder.start:
+                    reason = "older"
+                else:
+                    reason = "undecided"
+                others.append((mandate, reason))
+            self.conflicts.append(SeatConflict(code, holder, tuple(others)))
+
+        for conflict in self.conflicts:
+            for mandate, reason in conflict.others:
+                log = logger.error if reason == "undecided" else logger.warning
+                log(
+                    "Seat %s held by %s, also claimed by %s (%s)",
+                    conflict.circonscription_code,
+                    conflict.holder.acteur_ref,
+                    mandate.acteur_ref,
+                    reason,
+                )
+        return self.conflicts
+
+    def holds_seat(self, elected: Elected) -> bool:
+        """Whether a deputy holds their seat, always True for a deputy without a seat or not indexed."""
+        holder = self.holders.get(elected.circonscription_code)
+        return holder is None or holder.acteur_ref == elected.ref
@@ -0,0 +1,91 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from attrs import define
+
+from common.logger import logger
+from download.core import JsonZipArchive
+from process.schema import ORGANE_SCHEMA, trim_organe
+
+
+@define
+class Organe:
+    """The fields of an organe used to describe a deputy."""
+
+    uid: str
+    libelle: str
+    libelle_abrege: str
+    code_type: str
+
+    @classmethod
+    def from_json(cls, data: Any) -> Organe:
+        organe = data["organe"]
+        uid = organe["uid"]
+        return cls(
+            uid=uid["#text"] if isinstance(uid, dict) else uid,
+            libelle=organe.get("libelle") or "",
+            libelle_abrege=organe.get("libelleAbrege") or "",
+            code_type=organe.get("codeType") or "",
+        )
+
+
+class OrganeIndex:
+    """
+    In-memory index of the organes by uid,
+    built in one pass so that deputies resolve their organes without reading any file.
+
+    Parameters:
+        organes (Dict[str, Organe]): The organes by uid.
+    """
+
+    def __init__(self, organes: Dict[str, Organe]) -> None:
+        self.organes = organes
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.organes)
+
+    def get(self, uid: str) -> Optional[Organe]:
+        organe = self.organes.get(uid)
+        if organe is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return organe
+
+    def log_stats(self) -> None:
+        logger.debug(
+            "Organe index: %d organes, %d hits, %d misses",
+            len(self.organes),
+            self.hits,
+            self.misses,
+        )
+
+    @staticmethod
+    def _add(organes: Dict[str, Organe], data: Any) -> None:
+        try:
+            organe = Organe.from_json(data)
+        except (KeyError, TypeError) as e:
+            logger.error("Invalid organe: %s", e)
+            return
+        organes[organe.uid] = organe
+
+    @classmethod
+    async def from_archive(cls, archive: JsonZipArchive, folder: str) -> OrganeIndex:
+        """
+        Builds the index from the organe members of a zip archive.
+
+        Parameters:
+            archive (JsonZipArchive): The archive.
+            folder (str): The folder of the organe files in the archive.
+        """
+        organes: Dict[str, Organe] = {}
+        async for data in archive.read_jsons(folder, trim_organe, ORGANE_SCHEMA):
+            cls._add(organes, data)
+        logger.info("Indexed %d organes", len(organes))
+        return cls(organes)
@@ -0,0 +1,447 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+import aiofiles
+from aiofiles.threadpool.text import AsyncTextIOWrapper
+import yaml
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+from common.config import (
+    OUTPUT_BATCH_SIZE,
+    OUTPUT_CHANGESET,
+    OUTPUT_FOLDER,
+    OUTPUT_FORMATS,
+)
+from common.logger import logger
+from common.metrics import stage, stage_metrics
+from process.changeset import Changeset, read_snapshot
+from process.columnar import COLUMNAR_FORMATS_USED, elected_table, serialize_table
+from process.core import ELECTED_FIELDS, Elected
+
+# libyaml is much faster than the pure python emitter, when PyYAML was built with it
+YAML_DUMPER: Type[yaml.SafeDumper] = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+Member = Tuple[str, Elected]
+
+
+class ElectedDumper(YAML_DUMPER):  # type: ignore[valid-type, misc]
+    """Dumps the Elected records straight from their fields."""
+
+
+def represent_elected(dumper: yaml.SafeDumper, elected: Elected) -> yaml.Node:
+    return dumper.represent_mapping("tag:yaml.org,2002:map", elected.items())
+
+
+ElectedDumper.add_representer(Elected, represent_elected)
+
+# The json keys of the fields of Elected, sorted like json.dumps(sort_keys=True)
+JSON_FIELD_KEYS: Tuple[Tuple[str, str], ...] = tuple(
+    (name, f"{encode_basestring(name)}: ") for name in ELECTED_FIELDS
+)
+
+
+def json_value(value: Any) -> str:
+    return encode_basestring(value) if isinstance(value, str) else json.dumps(value)
+
+
+def json_elected(elected: Elected) -> str:
+    """
+    Serializes an Elected record like json.dumps(elected.to_dict(), ensure_ascii=False, sort_keys=True),
+    without building the dict.
+    """
+    return (
+        "{"
+        + ", ".join(
+            key + json_value(getattr(elected, name)) for name, key in JSON_FIELD_KEYS
+        )
+        + "}"
+    )
+
+
+class MemberFormat(ABC):
+    """
+    Serializes an output document piece by piece: the members one batch at a time,
+    then the metadata once every member is known.
+    The layout is the one of yaml.dump of {"members": ..., "metadata": ...}.
+    """
+
+    suffix: str = ""
+
+    @abstractmethod
+    def members(self, batch: List[Member], first: bool) -> str:
+        """The text of a batch of members, first when it is the first batch of the document."""
+
+    @abstractmethod
+    def end(self, metadata: Dict[str, Any], count: int) -> str:
+        """The text closing the document once count members were written."""
+
+
+class YamlFormat(MemberFormat):
+    suffix = "yaml"
+
+    def members(self, batch: List[Member], first: bool) -> str:
+        # The members stay in the order they were produced, their fields are sorted
+        dumped = yaml.dump(
+            dict(batch),
+            Dumper=ElectedDumper,
+            default_flow_style=False,
+            sort_keys=False,
+        )
+        # Each member is nested under members:, yaml only needs the indentation to be consistent
+        indented = "".join(f"  {line}" for line in dumped.splitlines(keepends=True))
+        return f"members:\n{indented}" if first else indented
+
+    def end(self, metadata: Dict[str, Any], count: int) -> str:
+        return ("" if count else "members: {}\n") + yaml.dump(
+            {"metadata": metadata}, Dumper=YAML_DUMPER, default_flow_style=False
+        )
+
+
+class JsonFormat(MemberFormat):
+    suffix = "json"
+
+    def members(self, batch: List[Member], first: bool) -> str:
+        dumped = ",\n".join(
+            f"{encode_basestring(key)}: {json_elected(elected)}"
+            for key, elected in batch
+        )
+        return f'{{"members": {{\n{dumped}' if first else f",\n{dumped}"
+
+    def end(self, metadata: Dict[str, Any], count: int) -> str:
+        dumped = json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+        return ("\n}" if count else '{"members": {}') + f', "metadata": {dumped}}}\n'
+
+
+class NdjsonFormat(MemberFormat):
+    """One member per line, without the metadata, for consumers reading it as a stream."""
+
+    suffix = "ndjson"
+
+    def members(self, batch: List[Member], first: bool) -> str:
+        return "".join(json_elected(elected) + "\n" for _, elected in batch)
+
+    def end(self, metadata: Dict[str, Any], count: int) -> str:
+        return ""
+
+
+def snapshot_line(key: str, elected: Elected) -> str:
+    """A line of the snapshot, as json.dumps([key, elected.to_dict()], ensure_ascii=False, sort_keys=True)."""
+    return f"[{encode_basestring(key)}, {json_elected(elected)}]\n"
+
+
+class SnapshotFormat(NdjsonFormat):
+    """The members of the last published output with their key, compared with by the next run."""
+
+    def members(self, batch: List[Member], first: bool) -> str:
+        return "".join(snapshot_line(key, elected) for key, elected in batch)
+
+
+FORMATS: Dict[str, Type[MemberFormat]] = {
+    format_class.suffix: format_class
+    for format_class in (YamlFormat, JsonFormat, NdjsonFormat)
+}
+
+for output_format in OUTPUT_FORMATS:
+    if output_format not in FORMATS:
+        raise ValueError(
+            f"Unknown output format {output_format}, expected {', '.join(FORMATS)}"
+        )
+
+
+def output_path(name: str, output_format: Optional[str] = None) -> Path:
+    """The output file of a chamber, in the first configured format by default."""
+    return OUTPUT_FOLDER / f"{name}.{output_format or OUTPUT_FORMATS[0]}"
+
+
+def snapshot_path(name: str) -> Path:
+    """The snapshot of the members last published for a chamber."""
+    return OUTPUT_FOLDER / f".{name}.snapshot.ndjson"
+
+
+def changeset_path(name: str) -> Path:
+    """The changes between the last two published outputs of a chamber."""
+    return OUTPUT_FOLDER / f"{name}.changes.json"
+
+
+def conflicts_path(name: str) -> Path:
+    """The seats claimed by several members in the last processing of a chamber."""
+    return OUTPUT_FOLDER / f"{name}.conflicts.json"
+
+
+def state_path(name: str) -> Path:
+    """The file keeping the hash of the members last published for a chamber."""
+    return OUTPUT_FOLDER / f".{name}.state.json"
+
+
+def read_members_sha256(name: str) -> Optional[str]:
+    """The hash of the members last published for a chamber, None if unknown."""
+    try:
+        with open(state_path(name), encoding="utf-8") as f:
+            members_sha256 = json.load(f).get("members_sha256")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return members_sha256 if isinstance(members_sha256, str) else None
+
+
+def fsync_directory(directory: Path) -> None:
+    """Flushes the renames of a directory to disk, where a directory can be opened."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_size(path: Path) -> int:
+    """The size of a file in bytes, 0 when it does not exist."""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def write_atomically(path: Path, content: Union[str, bytes]) -> None:
+    """Writes a file next to its destination, syncs it and renames it over the destination."""
+    temp_path = path.with_name(f"{path.name}.tmp")
+    if isinstance(content, bytes):
+        with open(temp_path, "wb") as binary_file:
+            binary_file.write(content)
+            binary_file.flush()
+            os.fsync(binary_file.fileno())
+    else:
+        with open(temp_path, "w", encoding="utf-8") as text_file:
+            text_file.write(content)
+            text_file.flush()
+            os.fsync(text_file.fileno())
+    os.replace(temp_path, path)
+    fsync_directory(path.parent)
+
+
+class OutputWriter:
+    """
+    Writes the output files of a chamber while its members are produced.
+    The members are serialized by batches in a thread, so neither the whole document
+    nor its serialized text is kept in memory and the event loop is not blocked.
+    Each file is written next to its destination, synced to disk and renamed over it
+    once complete, so a reader never sees a partial file.
+    When the members hash the same as the last published ones, the previous files are kept,
+    so their last_updated only changes with the data.
+    Otherwise, the members are compared with the snapshot of the previous output and
+    the added, removed and modified members are written to the changeset file.
+    The members are also kept as Arrow tables when columnar formats are enabled,
+    and exported once complete.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        formats: Optional[List[str]] = None,
+        batch_size: int = OUTPUT_BATCH_SIZE,
+        columnar_formats: Optional[List[str]] = None,
+    ) -> None:
+        self.name = name
+        self.formats = [
+            FORMATS[output_format]() for output_format in formats or OUTPUT_FORMATS
+        ]
+        self.columnar_formats = (
+            COLUMNAR_FORMATS_USED if columnar_formats is None else columnar_formats
+        )
+        self._tables: List[pa.Table] = []
+        self.batch_size = max(batch_size, 1)
+        self.count = 0
+        self.changed = False
+        self.changeset: Optional[Changeset] = None
+        self._hasher = hashlib.sha256()
+        self._previous_sha256: Optional[str] = None
+        self._batch: List[Member] = []
+        self._keys: Set[str] = set()
+        self._files: List[Tuple[Path, AsyncTextIOWrapper]] = []
+
+    def _temp_path(self, path: Path) -> Path:
+        return path.with_name(f"{path.name}.tmp")
+
+    async def open(self) -> None:
+        self._previous_sha256 = read_members_sha256(self.name)
+        if OUTPUT_CHANGESET:
+            previous = await asyncio.to_thread(read_snapshot, snapshot_path(self.name))
+            if previous is not None:
+                self.changeset = Changeset(previous)
+        # The snapshot is published along the output files, for the next run
+        self.formats.append(SnapshotFormat())
+
+        for output_format in self.formats:
+            if isinstance(output_format, SnapshotFormat):
+                path = snapshot_path(self.name)
+            else:
+                path = output_path(self.name, output_format.suffix)
+            f = await aiofiles.open(self._temp_path(path), mode="w", encoding="utf-8")
+            self._files.append((path, f))
+
+    async def serialize(self, members: Iterable[Member]) -> List[str]:
+        """
+        Adds the members of a batch, serialized in a thread once OUTPUT_BATCH_SIZE members are waiting,
+        to be passed to write. The remaining members are serialized and written by close.
+        The first member of a key is kept, the duplicates are dropped.
+
+        Returns:
+            List[str]: The text of the members in each output file, empty while they wait.
+        """
+        for key, member in members:
+            if key in self._keys:
+                logger.warning(
+                    "Duplicate member %s in %s, keeping the first", key, self.name
+                )
+                continue
+            self._keys.add(key)
+            self._batch.append((key, member))
+        if len(self._batch) < self.batch_size:
+            return []
+        return await self._serialize_waiting()
+
+    async def _serialize_waiting(self) -> List[str]:
+        batch, self._batch = self._batch, []
+        if not batch:
+            return []
+        first = self.count == 0
+        self.count += len(batch)
+        stage_metrics("serialize").records += len(batch)
+        return await asyncio.to_thread(self._serialize, batch, first)
+
+    async def write(self, chunks: List[str]) -> None:
+        """Writes serialized members to the output files, in the order they were serialized."""
+        for (_, f), chunk in zip(self._files, chunks):
+            await f.write(chunk)
+
+    def _serialize(self, batch: List[Member], first: bool) -> List[str]:
+        chunks = [output_format.members(batch, first) for output_format in self.formats]
+        # The snapshot is the last format, the members hash is the hash of its lines
+        self._hasher.update(chunks[-1].encode())
+        if self.columnar_formats:
+            self._tables.append(elected_table([elected for _, elected in batch]))
+        if self.changeset is not None:
+            for key, elected in batch:
+                self.changeset.compare(key, elected)
+        return chunks
+
+    async def close(self) -> None:
+        """Writes the metadata and publishes the output files, unless the members did not change."""
+        if self._batch:
+            with stage("serialize"):
+                await self.write(await self._serialize_waiting())
+        members_sha256 = self._hasher.hexdigest()
+        columnar_paths = [
+            output_path(self.name, columnar_format)
+            for columnar_format in self.columnar_formats
+        ]
+        if members_sha256 == self._previous_sha256 and all(
+            path.exists() for path in [path for path, _ in self._files] + columnar_paths
+        ):
+            logger.info("Members of %s did not change, output kept", self.name)
+            await self.discard()
+            return
+
+        with stage("publish") as metrics:
+            paths = [path for path, _ in self._files] + columnar_paths
+            await self._publish(members_sha256, columnar_paths)
+            metrics.records += self.count
+            metrics.bytes_out += sum(file_size(path) for path in paths)
+        self.changed = True
+
+    async def _publish(self, members_sha256: str, columnar_paths: List[Path]) -> None:
+        """Completes the output files and renames them over the previous ones, the state last."""
+        metadata: Dict[str, Any] = {
+            "last_updated": datetime.now().isoformat(),
+            "count": self.count,
+        }
+        for output_format, (path, f) in zip(self.formats, self._files):
+            await f.write(output_format.end(metadata, self.count))
+            await f.flush()
+            await asyncio.to_thread(os.fsync, f.fileno())
+            await f.close()
+            os.replace(self._temp_path(path), path)
+        self._files = []
+
+        if self.columnar_formats:
+            table = (
+                pa.concat_tables(self._tables) if self._tables else elected_table([])
+            )
+            for columnar_format, path in zip(self.columnar_formats, columnar_paths):
+                content = await asyncio.to_thread(
+                    serialize_table, table, columnar_format
+                )
+                await asyncio.to_thread(write_atomically, path, content)
+
+        if self.changeset is not None:
+            changes = self.changeset.to_dict(
+                {
+                    **metadata,
+                    "previous_sha256": self._previous_sha256,
+                    "members_sha256": members_sha256,
+                }
+            )
+            await asyncio.to_thread(
+                write_atomically,
+                changeset_path(self.name),
+                json.dumps(changes, ensure_ascii=False, indent=2, sort_keys=True)
+                + "\n",
+            )
+            logger.info(
+                "%s: %d added, %d removed, %d modified",
+                self.name,
+                changes["metadata"]["added"],
+                changes["metadata"]["removed"],
+                changes["metadata"]["modified"],
+            )
+
+        # The state is written last: if the run stops before, the next one publishes again
+        await asyncio.to_thread(
+            write_atomically,
+            state_path(self.name),
+            json.dumps(
+                {"members_sha256": members_sha256, "count": self.count}, indent=2
+            ),
+        )
+
+    async def discard(self) -> None:
+        """Drops the partial output files, the previous ones are left untouched."""
+        for path, f in self._files:
+            await f.close()
+            self._temp_path(path).unlink(missing_ok=True)
+        self._files = []
+
+    async def __aenter__(self) -> OutputWriter:
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.discard()
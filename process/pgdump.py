@@ -0,0 +1,112 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Streaming reader of the COPY ... FROM stdin blocks of a pg_dump plain sql file.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Python codecs of the postgres client encodings
+ENCODINGS = {
+    "UTF8": "utf-8",
+    "LATIN1": "latin-1",
+    "LATIN9": "iso8859-15",
+    "WIN1252": "cp1252",
+    "SQL_ASCII": "latin-1",
+}
+
+COPY_HEADER = re.compile(
+    r'^COPY\s+(?:"?\w+"?\.)?"?(?P<table>\w+)"?\s*\((?P<columns>[^)]*)\)\s+FROM\s+stdin;',
+    re.IGNORECASE,
+)
+CLIENT_ENCODING = re.compile(r"^SET\s+client_encoding\s*=\s*'(?P<encoding>\w+)'", re.I)
+COPY_ESCAPE = re.compile(r"\\(?:([0-7]{1,3})|x([0-9a-fA-F]{1,2})|(.))")
+COPY_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+END_OF_COPY = b"\\."
+NULL = "\\N"
+
+# A row of a table, by column name
+Row = Dict[str, Optional[str]]
+
+
+def _unescape_match(match: re.Match[str]) -> str:
+    octal, hexadecimal, char = match.groups()
+    if octal:
+        return chr(int(octal, 8))
+    if hexadecimal:
+        return chr(int(hexadecimal, 16))
+    return COPY_ESCAPES.get(char, char)
+
+
+def unescape_copy_value(value: str) -> Optional[str]:
+    """Decodes a value of the COPY text format, \\N being NULL."""
+    if value == NULL:
+        return None
+    if "\\" not in value:
+        return value
+    return COPY_ESCAPE.sub(_unescape_match, value)
+
+
+def iter_copy_rows(
+    dump_file: Path, tables: Mapping[str, Sequence[str]]
+) -> Iterator[Tuple[str, Row]]:
+    """
+    Reads a pg_dump plain sql file line by line and yields the rows of some tables.
+    The rows of the other tables are skipped without being decoded.
+
+    Parameters:
+        dump_file (Path): The sql file.
+        tables (Mapping[str, Sequence[str]]): The columns to keep for each table to read.
+
+    Yields:
+        Tuple[str, Row]: The table name and the kept columns of each row.
+    """
+    encoding = "utf-8"
+    table: Optional[str] = None
+    skipping: bool = False
+    indexes: List[Tuple[str, int]] = []
+
+    with open(dump_file, "rb") as f:
+        for raw_line in f:
+            if skipping:
+                skipping = raw_line.rstrip(b"\r\n") != END_OF_COPY
+                continue
+
+            if table is None:
+                if raw_line.startswith(b"SET"):
+                    encoding_match = CLIENT_ENCODING.match(raw_line.decode("latin-1"))
+                    if encoding_match:
+                        name = encoding_match["encoding"].upper()
+                        encoding = ENCODINGS.get(name, name)
+                    continue
+                if not raw_line.startswith(b"COPY"):
+                    continue
+                header = COPY_HEADER.match(raw_line.decode(encoding))
+                if header is None:
+                    continue
+                if header["table"] not in tables:
+                    skipping = True
+                    continue
+                table = header["table"]
+                columns = [
+                    column.strip().strip('"') for column in header["columns"].split(",")
+                ]
+                missing = [column for column in tables[table] if column not in columns]
+                if missing:
+                    raise ValueError(f"Columns {missing} not found in table {table}")
+                indexes = [(column, columns.index(column)) for column in tables[table]]
+                continue
+
+            line = raw_line.rstrip(b"\r\n")
+            if line == END_OF_COPY:
+                table = None
+                continue
+            values = line.decode(encoding).split("\t")
+            yield table, {
+                column: unescape_copy_value(values[index]) for column, index in indexes
+            }
@@ -0,0 +1,247 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Streaming of the members of a chamber through stages, from their source to the output files
+(source -> parse -> build -> serialize -> write).
+The stages are connected by bounded queues: when a stage falls behind, the queue before it fills up
+and the stages before it wait, up to the source. Only a few batches are then in flight,
+whatever the number of members. What a stage keeps across batches still grows with the members,
+e.g. the output keys, the previous snapshot of the changeset and the columnar tables of OutputWriter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from typing import (
+    Any,
+    AsyncIterable,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from attrs import frozen
+
+from common.config import PIPELINE_QUEUE_SIZE
+from common.metrics import stage
+from process.output import OutputWriter
+
+T = TypeVar("T")
+
+# Put after the last item, with the position following it
+_END = object()
+
+# The position of an item from the source, and the item or its result
+Slot = Tuple[int, Any]
+
+
+def batched(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """The items by lists of size, the last one shorter."""
+    size = max(1, size)
+    for i in range(0, len(items), size):
+        yield list(items[i : i + size])
+
+
+@frozen
+class Stage:
+    """
+    A step of a pipeline, calling function with each item and passing its result to the next stage.
+
+    Parameters:
+        name (str): The name of the stage in the report of the update.
+        function (Callable): Called with each item, a coroutine function is awaited.
+        workers (int): The number of items handled at the same time.
+            Their results are passed on in the order of the items all the same.
+        thread (bool): Whether function is called in a thread, for a blocking function.
+        records (Optional[str]): What is counted as the records of the stage,
+            the length of the "result" or of the "input" item, nothing when None.
+    """
+
+    name: str
+    function: Callable[[Any], Any]
+    workers: int = 1
+    thread: bool = False
+    records: Optional[str] = "result"
+
+    async def apply(self, item: Any) -> Any:
+        with stage(self.name) as metrics:
+            if self.thread:
+                result = await asyncio.to_thread(self.function, item)
+            else:
+                result = self.function(item)
+                if inspect.isawaitable(result):
+                    result = await result
+            counted = item if self.records == "input" else result
+            if self.records is not None and isinstance(counted, Sized):
+                metrics.records += len(counted)
+        return result
+
+
+async def _wait_or_cancel(tasks: Sequence[asyncio.Task[Any]]) -> None:
+    """Waits for every task, or cancels the others as soon as one fails and raises its error."""
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class _Turns:
+    """Lets the workers of a stage pass their results on in the order of the items."""
+
+    def __init__(self) -> None:
+        self.position = 0
+        self._changed = asyncio.Condition()
+
+    async def wait(self, position: int) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.position == position)
+
+    async def next(self) -> None:
+        async with self._changed:
+            self.position += 1
+            self._changed.notify_all()
+
+
+class Pipeline:
+    """
+    Runs the items of a source through stages, each with its own workers,
+    connected by queues of queue_size items.
+    The results of the last stage are dropped, it is the sink, e.g. writing the output files.
+    Every stage gets the items in the order of the source.
+
+    Parameters:
+        source (Union[AsyncIterable, Iterable]): The items, e.g. batches of rows, read lazily.
+        stages (Sequence[Stage]): The stages, in order.
+        queue_size (int): The number of items waiting before each stage.
+    """
+
+    def __init__(
+        self,
+        source: Union[AsyncIterable[Any], Iterable[Any]],
+        stages: Sequence[Stage],
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+    ) -> None:
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+
+    async def run(self) -> int:
+        """
+        Runs the stages until every item of the source went through them.
+        When a stage or the source fails, the other stages are cancelled and the error is raised.
+
+        Returns:
+            int: The number of items of the source.
+        """
+        queues: List[asyncio.Queue[Slot]] = [
+            asyncio.Queue(self.queue_size) for _ in self.stages
+        ]
+        feed = asyncio.create_task(self._feed(queues[0]))
+        stages = [
+            asyncio.create_task(
+                self._run_stage(
+                    pipeline_stage,
+                    queues[index],
+                    queues[index + 1] if index + 1 < len(queues) else None,
+                )
+            )
+            for index, pipeline_stage in enumerate(self.stages)
+        ]
+        await _wait_or_cancel([feed, *stages])
+        return feed.result()
+
+    async def _feed(self, queue: asyncio.Queue[Slot]) -> int:
+        count = 0
+        if isinstance(self.source, AsyncIterable):
+            items = aiter(self.source)
+            try:
+                async for item in items:
+                    await queue.put((count, item))
+                    count += 1
+            finally:
+                # Closes the source when the pipeline is cancelled, e.g. to release a cursor
+                aclose = getattr(items, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+        else:
+            for item in self.source:
+                await queue.put((count, item))
+                count += 1
+        await queue.put((count, _END))
+        return count
+
+    async def _run_stage(
+        self,
+        pipeline_stage: Stage,
+        queue: asyncio.Queue[Slot],
+        output: Optional[asyncio.Queue[Slot]],
+    ) -> None:
+        turns = _Turns()
+
+        async def work() -> int:
+            while True:
+                position, item = await queue.get()
+                if item is _END:
+                    # Left in the queue for the other workers
+                    queue.put_nowait((position, item))
+                    return position
+                result = await pipeline_stage.apply(item)
+                await turns.wait(position)
+                try:
+                    if output is not None:
+                        await output.put((position, result))
+                finally:
+                    await turns.next()
+
+        workers = [
+            asyncio.create_task(work()) for _ in range(max(1, pipeline_stage.workers))
+        ]
+        await _wait_or_cancel(workers)
+        if output is not None:
+            await output.put((workers[0].result(), _END))
+
+
+async def write_members(
+    name: str,
+    source: Union[AsyncIterable[Any], Iterable[Any]],
+    stages: Sequence[Stage],
+) -> int:
+    """
+    Writes the output files of a chamber from a pipeline: stages turn the items of source
+    into batches of members keyed by their output key, which are then serialized and written.
+    The output files are published once the pipeline completes, and left untouched if it fails.
+
+    Parameters:
+        name (str): The name of the output files, without suffix.
+        source (Union[AsyncIterable, Iterable]): The items of the first stage.
+        stages (Sequence[Stage]): The stages producing the members, each result a List[Member].
+
+    Returns:
+        int: The number of members written.
+    """
+    async with OutputWriter(name) as writer:
+        await Pipeline(
+            source,
+            [
+                *stages,
+                # One batch at a time, so the output files are written in order,
+                # the writer counts the records it serializes
+                Stage("serialize", writer.serialize, records=None),
+                Stage("write", writer.write, records=None),
+            ],
+        ).run()
+    return writer.count
@@ -0,0 +1,153 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""
+Shapes of the AMO10 acteur and organe documents used by the processing.
+The trim functions run in the parse pool workers, so this module
+must not import the configuration or the logger, which have side effects.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore[assignment]
+
+# Fields of a mandat used to describe a deputy
+MANDAT_FIELDS = (
+    "uid",
+    "typeOrgane",
+    "dateDebut",
+    "dateFin",
+    "election",
+    "organes",
+    "suppleants",
+    "mandature",
+)
+
+
+def trim_acteur(data: Any) -> Any:
+    """
+    Keeps only the fields of an acteur document read by Elected.from_deputy_json,
+    so that less data is sent back from the parse pool and kept in memory.
+    A document without the expected shape is returned untouched,
+    the processing then reports what is missing.
+    """
+    try:
+        acteur = data["acteur"]
+        mandats = acteur["mandats"]["mandat"]
+        adresses = acteur["adresses"]["adresse"]
+        trimmed_mandats: List[Dict[str, Any]] = [
+            {key: mandat[key] for key in MANDAT_FIELDS if key in mandat}
+            for mandat in (mandats if isinstance(mandats, list) else [mandats])
+        ]
+        trimmed_adresses: List[Dict[str, Any]] = [
+            adresse
+            for adresse in (adresses if isinstance(adresses, list) else [adresses])
+            if adresse.get("@xsi:type") == "AdresseMail_Type"
+        ]
+        return {
+            "acteur": {
+                "uid": acteur["uid"],
+                "etatCivil": {"ident": acteur["etatCivil"]["ident"]},
+                "mandats": {"mandat": trimmed_mandats},
+                "adresses": {"adresse": trimmed_adresses},
+            }
+        }
+    except (KeyError, TypeError, AttributeError):
+        return data
+
+
+def trim_organe(data: Any) -> Any:
+    """Keeps only the fields of an organe document read by Organe.from_json."""
+    try:
+        organe = data["organe"]
+        return {
+            "organe": {
+                key: organe[key]
+                for key in ("uid", "libelle", "libelleAbrege", "codeType")
+                if key in organe
+            }
+        }
+    except (KeyError, TypeError):
+        return data
+
+
+# Typed schemas of the acteur and organe documents, decoded by msgspec when installed.
+# Only the fields declared here are materialized; unknown fields are skipped while decoding.
+# A missing field defaults to UNSET, left out by to_builtins, while an explicit null is kept,
+# so a decoded document has the same keys as json.loads gives for these fields.
+ACTEUR_SCHEMA: Any = None
+ORGANE_SCHEMA: Any = None
+
+if msgspec is not None:
+
+    class Uid(msgspec.Struct):
+        text: str = msgspec.field(name="#text")
+
+    class Ident(msgspec.Struct):
+        civ: Union[str, msgspec.UnsetType] = msgspec.UNSET
+        nom: Union[str, msgspec.UnsetType] = msgspec.UNSET
+        prenom: Union[str, msgspec.UnsetType] = msgspec.UNSET
+
+    class EtatCivil(msgspec.Struct):
+        ident: Ident
+
+    class Lieu(msgspec.Struct):
+        numDepartement: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        departement: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        numCirco: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+
+    class Election(msgspec.Struct):
+        causeMandat: Union[str, List[str], None, msgspec.UnsetType] = msgspec.UNSET
+        lieu: Union[Lieu, None, msgspec.UnsetType] = msgspec.UNSET
+        refCirconscription: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+
+    class Organes(msgspec.Struct):
+        organeRef: Union[str, List[str], None, msgspec.UnsetType] = msgspec.UNSET
+
+    class Mandat(msgspec.Struct):
+        uid: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        typeOrgane: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        dateDebut: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        dateFin: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        election: Union[Election, None, msgspec.UnsetType] = msgspec.UNSET
+        organes: Union[Organes, None, msgspec.UnsetType] = msgspec.UNSET
+        suppleants: Any = msgspec.UNSET
+        mandature: Any = msgspec.UNSET
+
+    class Mandats(msgspec.Struct):
+        mandat: Union[List[Mandat], Mandat]
+
+    class Adresse(msgspec.Struct):
+        type: Union[str, msgspec.UnsetType] = msgspec.field(
+            name="@xsi:type", default=msgspec.UNSET
+        )
+        valElec: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+
+    class Adresses(msgspec.Struct):
+        adresse: Union[List[Adresse], Adresse]
+
+    class Acteur(msgspec.Struct):
+        uid: Uid
+        etatCivil: EtatCivil
+        mandats: Mandats
+        adresses: Adresses
+
+    class ActeurDocument(msgspec.Struct):
+        acteur: Acteur
+
+    class OrganeFields(msgspec.Struct):
+        uid: Union[str, Uid]
+        libelle: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        libelleAbrege: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+        codeType: Union[str, None, msgspec.UnsetType] = msgspec.UNSET
+
+    class OrganeDocument(msgspec.Struct):
+        organe: OrganeFields
+
+    ACTEUR_SCHEMA = ActeurDocument
+    ORGANE_SCHEMA = OrganeDocument
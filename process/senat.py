@@ -5,44 +5,203 @@ from __future__ import annotations
 
 import os
 import asyncio
-from datetime import datetime
+import hashlib
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-import aiofiles
-import yaml
 import asyncpg
 
-from common.config import OUTPUT_FOLDER, POSTGRES_OPTIONS
+from common.config import (
+    OUTPUT_BATCH_SIZE,
+    PIPELINE_BUILD_WORKERS,
+    POSTGRES_OPTIONS,
+    POSTGRES_CURSOR_PREFETCH,
+    SENAT_LOADER,
+    SENAT_STAGING_SCHEMA,
+)
+from common.database import Connection, close_pool, connect_maintenance, get_pool
 from common.logger import logger
+from common.metrics import timed_iter
 from process.core import Elected
+from process.output import Member, file_size, output_path
+from process.pipeline import Stage, batched, write_members
+from process.pgdump import Row, iter_copy_rows
 
+SENAT_OUTPUT_NAME = "senat"
+SENAT_OUTPUT_FILE: Path = output_path(SENAT_OUTPUT_NAME)
 
-async def export_from_sql_file(senat_sql_file: Path) -> List[Any]:
+# Columns of the senat dump used to find the active senators, by table
+SENAT_DUMP_TABLES: Dict[str, Tuple[str, ...]] = {
+    "sen": (
+        "senmat",
+        "quacod",
+        "sennomuse",
+        "senprenomuse",
+        "senema",
+        "sengrppolcodcou",
+        "sencirnumcou",
+        "etasencod",
+    ),
+    "grppol": ("grppolcod", "grppollilcou"),
+    "dpt": ("dptnum", "dptcod", "dptlib"),
+}
+
+
+# Active senators with their group and departement, from the tables of a schema
+ACTIVE_SENATORS_QUERY = """select
+    sen.senmat,
+    sen.quacod,
+    sen.sennomuse,
+    sen.senprenomuse,
+    dpt.dptcod,
+    dpt.dptlib,
+    grppol.grppolcod,
+    grppol.grppollilcou,
+    sen.senema
+from {schema}.sen
+join {schema}.grppol on grppol.grppolcod = sen.sengrppolcodcou
+join {schema}.dpt on dpt.dptnum = sen.sencirnumcou
+where sen.etasencod = 'ACTIF'"""
+
+
+def export_from_dump_file(senat_sql_file: Path) -> List[Dict[str, Optional[str]]]:
+    """
+    Reads the active senators straight from the COPY blocks of the senat sql dump,
+    without loading it in a postgres server.
+    Does in memory the same join as ACTIVE_SENATORS_QUERY.
+
+    Parameters:
+        senat_sql_file (Path): The export_sens.sql dump.
+
+    Returns:
+        List[Dict[str, Optional[str]]]:
+            The active senators, with the columns of ACTIVE_SENATORS_QUERY.
+    """
+    logger.info("Reading %s", senat_sql_file)
+    senators: List[Row] = []
+    groups: Dict[Optional[str], Row] = {}
+    departements: Dict[Optional[str], Row] = {}
+
+    for table, row in iter_copy_rows(senat_sql_file, SENAT_DUMP_TABLES):
+        if table == "sen":
+            if row["etasencod"] == "ACTIF":
+                senators.append(row)
+        elif table == "grppol":
+            groups[row["grppolcod"]] = row
+        elif table == "dpt":
+            departements[row["dptnum"]] = row
+
+    rows: List[Dict[str, Optional[str]]] = []
+    for senator in senators:
+        group = groups.get(senator["sengrppolcodcou"])
+        departement = departements.get(senator["sencirnumcou"])
+        if group is None or departement is None:
+            logger.warning(
+                "Senator %s has no group or departement, skipped", senator["senmat"]
+            )
+            continue
+        rows.append(
+            {
+                "senmat": senator["senmat"],
+                "quacod": senator["quacod"],
+                "sennomuse": senator["sennomuse"],
+                "senprenomuse": senator["senprenomuse"],
+                "dptcod": departement["dptcod"],
+                "dptlib": departement["dptlib"],
+                "grppolcod": group["grppolcod"],
+                "grppollilcou": group["grppollilcou"],
+                "senema": senator["senema"],
+            }
+        )
+
+    logger.info(f"Found {len(rows)} rows")
+    return rows
+
+
+async def iter_active_senators(
+    conn: Connection, schema: str
+) -> AsyncIterator[asyncpg.Record]:
+    """
+    Streams the active senators from the tables of a schema with a server-side cursor.
+    The query is prepared once per connection and kept in the statement cache of asyncpg,
+    so a pooled connection reuses it between updates.
+
+    Parameters:
+        conn (Connection): The connection to the database.
+        schema (str): The schema of the sen, grppol and dpt tables.
+
+    Yields:
+        asyncpg.Record: Each active senator, with the columns of ACTIVE_SENATORS_QUERY.
+    """
+    # Server-side cursors only live inside a transaction
+    async with conn.transaction(readonly=True):
+        async for record in conn.cursor(
+            ACTIVE_SENATORS_QUERY.format(schema=schema),
+            prefetch=POSTGRES_CURSOR_PREFETCH,
+        ):
+            yield record
+
+
+async def iter_active_senator_batches(
+    conn: Connection, schema: str, batch_size: int = OUTPUT_BATCH_SIZE
+) -> AsyncIterator[List[Any]]:
+    """
+    Streams the active senators of the tables of a schema by batch of batch_size,
+    see iter_active_senators. The cursor is read as fast as the batches are consumed.
+
+    Parameters:
+        conn (Connection): The connection to the database.
+        schema (str): The schema of the sen, grppol and dpt tables.
+        batch_size (int): The number of rows of each batch.
+
+    Yields:
+        List[Any]: The active senators, with the columns of ACTIVE_SENATORS_QUERY.
+    """
+    count = 0
+    batch: List[Any] = []
+    async for record in iter_active_senators(conn, schema):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            count += len(batch)
+            yield batch
+            batch = []
+    if batch:
+        count += len(batch)
+        yield batch
+    logger.info(f"Found {count} rows")
+
+
+async def iter_sql_file_rows(
+    senat_sql_file: Path, batch_size: int = OUTPUT_BATCH_SIZE
+) -> AsyncIterator[List[Any]]:
+    """
+    Loads the senat dump with psql in a new POSTGRES_DATABASE,
+    then streams the active senators from it by batch of batch_size.
+    The database is dropped once the last batch is consumed.
+    Its connection is taken from the shared pool. The pool is closed around
+    the DROP DATABASE, which postgres refuses while connections are open.
+
+    Parameters:
+        senat_sql_file (Path): The export_sens.sql dump.
+        batch_size (int): The number of rows of each batch.
+
+    Yields:
+        List[Any]: The active senators, with the columns of ACTIVE_SENATORS_QUERY.
+    """
     env = os.environ.copy()
     env["PGPASSWORD"] = POSTGRES_OPTIONS.password
 
     logger.info("Creating database %s", POSTGRES_OPTIONS.database)
-    conn = await asyncpg.connect(
-        database="postgres",
-        user=POSTGRES_OPTIONS.user,
-        password=POSTGRES_OPTIONS.password,
-        host=POSTGRES_OPTIONS.host,
-    )
-
-    await conn.execute(f"DROP DATABASE IF EXISTS {POSTGRES_OPTIONS.database}")
-    await conn.execute(f"CREATE DATABASE {POSTGRES_OPTIONS.database}")
-    await conn.close()
-
-    logger.info("Loading %s", senat_sql_file)
-    conn = await asyncpg.connect(
-        database=POSTGRES_OPTIONS.database,
-        user=POSTGRES_OPTIONS.user,
-        password=POSTGRES_OPTIONS.password,
-        host=POSTGRES_OPTIONS.host,
-    )
+    await close_pool()
+    maintenance_conn = await connect_maintenance()
 
     try:
+        await maintenance_conn.execute(
+            f"DROP DATABASE IF EXISTS {POSTGRES_OPTIONS.database}"
+        )
+        await maintenance_conn.execute(f"CREATE DATABASE {POSTGRES_OPTIONS.database}")
+
+        logger.info("Loading %s", senat_sql_file)
         process = await asyncio.create_subprocess_exec(
             "psql",
             "-U",
@@ -64,64 +223,180 @@ async def export_from_sql_file(senat_sql_file: Path) -> List[Any]:
 
         logger.info("%s correcly loaded", senat_sql_file)
 
-        rows = await conn.fetch(
-            """select 
-	sen.senmat, 
-	sen.quacod, 
-	sen.sennomuse, 
-	sen.senprenomuse, 
-	dpt.dptcod,
-	dpt.dptlib,
-	grppol.grppolcod,
-	grppol.grppollilcou, 
-	sen.senema 
-from sen 
-join grppol on grppol.grppolcod = sen.sengrppolcodcou
-join dpt on dpt.dptnum = sen.sencirnumcou
-where etasencod = 'ACTIF'"""
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as conn:
+                async for batch in iter_active_senator_batches(
+                    conn, "public", batch_size
+                ):
+                    yield batch
+        finally:
+            await close_pool()
+
+        logger.info("Cleaning up database %s", POSTGRES_OPTIONS.database)
+        await maintenance_conn.execute(
+            f"DROP DATABASE IF EXISTS {POSTGRES_OPTIONS.database}"
         )
+    finally:
+        await maintenance_conn.close()
 
-        logger.info(f"Found {len(rows)} rows")
 
-    finally:
-        await conn.close()
-
-    logger.info("Cleaning up database %s", POSTGRES_OPTIONS.database)
-    conn = await asyncpg.connect(
-        database="postgres",
-        user=POSTGRES_OPTIONS.user,
-        password=POSTGRES_OPTIONS.password,
-        host=POSTGRES_OPTIONS.host,
+def read_dump_tables(senat_sql_file: Path) -> Dict[str, List[Tuple[Optional[str], ...]]]:
+    """Reads the SENAT_DUMP_TABLES columns of the senat dump as records, by table."""
+    records: Dict[str, List[Tuple[Optional[str], ...]]] = {
+        table: [] for table in SENAT_DUMP_TABLES
+    }
+    for table, row in iter_copy_rows(senat_sql_file, SENAT_DUMP_TABLES):
+        records[table].append(tuple(row.values()))
+    return records
+
+
+def file_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def create_staging_schema(conn: Connection, schema: str) -> None:
+    """Creates the staging tables and their indexes if they do not exist yet."""
+    statements = [f"CREATE SCHEMA IF NOT EXISTS {schema}"]
+    for table, columns in SENAT_DUMP_TABLES.items():
+        definition = ", ".join(f"{column} text" for column in columns)
+        statements.append(f"CREATE TABLE IF NOT EXISTS {schema}.{table} ({definition})")
+    statements += [
+        f"CREATE INDEX IF NOT EXISTS sen_etasencod_idx ON {schema}.sen (etasencod)",
+        f"CREATE INDEX IF NOT EXISTS grppol_grppolcod_idx ON {schema}.grppol (grppolcod)",
+        f"CREATE INDEX IF NOT EXISTS dpt_dptnum_idx ON {schema}.dpt (dptnum)",
+        f"""CREATE TABLE IF NOT EXISTS {schema}.load_state (
+            id integer PRIMARY KEY,
+            dump_sha256 text NOT NULL,
+            loaded_at timestamptz NOT NULL
+        )""",
+    ]
+    for statement in statements:
+        await conn.execute(statement)
+
+
+async def load_staging(
+    conn: Connection, schema: str, senat_sql_file: Path
+) -> None:
+    """
+    Loads the senat dump in a persistent staging schema.
+    Only the SENAT_DUMP_TABLES columns are loaded, with binary COPY,
+    the tables being truncated and reloaded in one transaction.
+    The load is skipped when the dump did not change since the last load.
+
+    Parameters:
+        conn (Connection): The connection to the database.
+        schema (str): The staging schema, created if missing.
+        senat_sql_file (Path): The export_sens.sql dump.
+    """
+    dump_sha256 = await asyncio.to_thread(file_sha256, senat_sql_file)
+    await create_staging_schema(conn, schema)
+    loaded_sha256 = await conn.fetchval(
+        f"SELECT dump_sha256 FROM {schema}.load_state WHERE id = 1"
     )
+    if loaded_sha256 == dump_sha256:
+        logger.info("%s already loaded in %s", senat_sql_file, schema)
+        return
 
-    await conn.execute(f"DROP DATABASE IF EXISTS {POSTGRES_OPTIONS.database}")
-    await conn.close()
+    logger.info("Loading %s in %s", senat_sql_file, schema)
+    records = await asyncio.to_thread(read_dump_tables, senat_sql_file)
+    async with conn.transaction():
+        await conn.execute(
+            f"TRUNCATE {', '.join(f'{schema}.{table}' for table in records)}"
+        )
+        for table, table_records in records.items():
+            await conn.copy_records_to_table(
+                table,
+                records=table_records,
+                columns=SENAT_DUMP_TABLES[table],
+                schema_name=schema,
+            )
+        await conn.execute(
+            f"""INSERT INTO {schema}.load_state (id, dump_sha256, loaded_at)
+            VALUES (1, $1, now())
+            ON CONFLICT (id) DO UPDATE
+            SET dump_sha256 = EXCLUDED.dump_sha256, loaded_at = EXCLUDED.loaded_at""",
+            dump_sha256,
+        )
+    # Refresh the planner statistics after the reload
+    await conn.execute(f"ANALYZE {schema}.sen, {schema}.grppol, {schema}.dpt")
+    logger.info("%s correcly loaded", senat_sql_file)
 
-    return rows
 
+async def iter_staging_rows(
+    senat_sql_file: Path, batch_size: int = OUTPUT_BATCH_SIZE
+) -> AsyncIterator[List[Any]]:
+    """
+    Loads the senat dump in the staging schema, see load_staging,
+    then streams the active senators from it by batch of batch_size.
+    The connection is held until the last batch is consumed,
+    the cursor being read as fast as the batches are.
 
-async def process_file_senat_async(senat_file: Path) -> None:
-    logger.info("Processing senat file %s", senat_file)
+    Parameters:
+        senat_sql_file (Path): The export_sens.sql dump.
+        batch_size (int): The number of rows of each batch.
 
-    senats: List[Elected] = []
+    Yields:
+        List[Any]: The active senators, with the columns of ACTIVE_SENATORS_QUERY.
+    """
+    schema = SENAT_STAGING_SCHEMA
+    if not schema.isidentifier():
+        raise ValueError(f"Invalid SENAT_STAGING_SCHEMA {schema}")
 
-    for data in await export_from_sql_file(senat_file):
-        senats.append(await Elected.from_senat(data))
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        await load_staging(conn, schema, senat_sql_file)
+        async for batch in iter_active_senator_batches(conn, schema, batch_size):
+            yield batch
 
-    senats_dict: Dict[str, Any] = {senat.ref: senat.to_dict() for senat in senats}
 
-    output: Dict[str, Any] = {
-        "metadata": {
-            "last_updated": datetime.now().isoformat(),
-            "count": len(senats_dict),
-        },
-        "members": senats_dict,
-    }
+async def iter_senat_rows(senat_file: Path) -> AsyncIterator[List[Any]]:
+    """
+    Streams the active senators of the senat dump by batch, read with SENAT_LOADER.
+    The staging and postgres loaders stream them from a cursor on a pooled connection,
+    the dump loader joins the tables in memory first.
+    """
+    if SENAT_LOADER == "staging":
+        async for records in iter_staging_rows(senat_file):
+            yield records
+        return
+    if SENAT_LOADER == "postgres":
+        async for records in iter_sql_file_rows(senat_file):
+            yield records
+        return
+
+    if SENAT_LOADER != "dump":
+        raise ValueError(
+            f"Unknown SENAT_LOADER {SENAT_LOADER}, expected dump, staging or postgres"
+        )
+    rows = await asyncio.to_thread(export_from_dump_file, senat_file)
+    for batch in batched(rows, OUTPUT_BATCH_SIZE):
+        yield batch
+
 
-    async with aiofiles.open(
-        OUTPUT_FOLDER / "senat.yaml", mode="w+", encoding="utf-8"
-    ) as f:
-        await f.write(yaml.dump(output))
-        await f.flush()
+def build_senat(rows: List[Any]) -> List[Member]:
+    """The senators of a batch of rows, keyed by their ref."""
+    return [(senat.ref, senat) for senat in Elected.from_senat_rows(rows)]
+
+
+async def process_file_senat_async(senat_file: Path) -> None:
+    logger.info("Processing senat file %s", senat_file)
+
+    await write_members(
+        SENAT_OUTPUT_NAME,
+        timed_iter("load", iter_senat_rows(senat_file), bytes_in=file_size(senat_file)),
+        [
+            Stage(
+                "build",
+                build_senat,
+                workers=PIPELINE_BUILD_WORKERS,
+                thread=PIPELINE_BUILD_WORKERS > 1,
+            )
+        ],
+    )
 
     logger.info("Process senat done")
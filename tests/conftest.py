@@ -0,0 +1,13 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+"""Settings required by common.config, set before the modules under test import it."""
+
+import os
+import tempfile
+
+os.environ.setdefault("OUTPUT_FOLDER", tempfile.mkdtemp(prefix="elected-tests-"))
+os.environ.setdefault("POSTGRES_PASSWORD", "tests")
+os.environ.setdefault(
+    "LOG_PATH", os.path.join(os.environ["OUTPUT_FOLDER"], "tests.log")
+)
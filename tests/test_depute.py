@@ -0,0 +1,44 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from process.depute import read_conflicts, save_conflicts
+from process.mandate import Mandate, SeatConflict
+
+HOLDER = Mandate("PM2", "PA2", "7501", "2024-07-18", None, None, None)
+OTHER = Mandate("PM1", "PA1", "7501", "2024-07-07", None, None, None)
+CONFLICT = SeatConflict("7501", HOLDER, ((OTHER, "older"),))
+
+
+def test_save_conflicts_writes_changed_conflicts(tmp_path: Path) -> None:
+    path = tmp_path / "deputies.conflicts.json"
+    save_conflicts(path, [CONFLICT])
+
+    content = json.loads(path.read_text(encoding="utf-8"))
+    assert content["metadata"]["count"] == 1
+    assert read_conflicts(path) == [CONFLICT.to_dict()]
+
+
+def test_save_conflicts_keeps_unchanged_file(tmp_path: Path) -> None:
+    path = tmp_path / "deputies.conflicts.json"
+    save_conflicts(path, [CONFLICT])
+    written = path.read_text(encoding="utf-8")
+
+    save_conflicts(path, [CONFLICT])
+
+    assert path.read_text(encoding="utf-8") == written
+
+
+def test_save_conflicts_removes_stale_file(tmp_path: Path) -> None:
+    path = tmp_path / "deputies.conflicts.json"
+    save_conflicts(path, [CONFLICT])
+
+    save_conflicts(path, [])
+
+    assert not path.exists()
+    # Nothing to remove
+    save_conflicts(path, [])
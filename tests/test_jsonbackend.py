@@ -0,0 +1,82 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from download.jsonbackend import JsonDecoder, available_backends
+from process.mandate import is_general_election, select_election
+from process.schema import ACTEUR_SCHEMA, ORGANE_SCHEMA, trim_acteur, trim_organe
+
+# An acteur whose first mandat has a null election and whose second election has a null cause,
+# next to fields left out entirely
+ACTEUR = json.dumps(
+    {
+        "acteur": {
+            "uid": {"#text": "PA1"},
+            "etatCivil": {"ident": {"civ": "", "nom": "Dupont", "prenom": "Jean"}},
+            "mandats": {
+                "mandat": [
+                    {
+                        "uid": "PM1",
+                        "typeOrgane": "ASSEMBLEE",
+                        "dateDebut": "2022-06-22",
+                        "dateFin": None,
+                        "election": None,
+                        "organes": {"organeRef": "PO1"},
+                    },
+                    {
+                        "uid": "PM2",
+                        "typeOrgane": "ASSEMBLEE",
+                        "dateDebut": "2024-07-18",
+                        "election": {
+                            "causeMandat": None,
+                            "lieu": {"numDepartement": "75", "numCirco": "1"},
+                        },
+                        "suppleants": None,
+                    },
+                    {"uid": "PM3", "typeOrgane": "GP"},
+                ]
+            },
+            "adresses": {
+                "adresse": [
+                    {"@xsi:type": "AdresseMail_Type", "valElec": "jean@example.org"},
+                    {"@xsi:type": "AdresseSiteWeb_Type", "valElec": None},
+                ]
+            },
+        }
+    }
+).encode()
+
+ORGANE = json.dumps(
+    {"organe": {"uid": "PO1", "libelle": None, "codeType": "GP", "other": 1}}
+).encode()
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_typed_decode_keeps_nulls_and_missing_fields(backend: str) -> None:
+    if ACTEUR_SCHEMA is None:
+        pytest.skip("msgspec is not installed")
+    expected = JsonDecoder("json", trim=trim_acteur)(ACTEUR)
+
+    decoded = JsonDecoder(backend, ACTEUR_SCHEMA, trim_acteur)(ACTEUR)
+
+    assert decoded == expected
+    mandats = decoded["acteur"]["mandats"]["mandat"]
+    assert select_election(mandats) == 1
+    assert not is_general_election(mandats[1]["election"])
+    assert "dateFin" not in mandats[1]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_typed_decode_of_an_organe(backend: str) -> None:
+    if ORGANE_SCHEMA is None:
+        pytest.skip("msgspec is not installed")
+
+    decoded = JsonDecoder(backend, ORGANE_SCHEMA, trim_organe)(ORGANE)
+
+    assert decoded == JsonDecoder("json", trim=trim_organe)(ORGANE)
+    assert decoded == {"organe": {"uid": "PO1", "libelle": None, "codeType": "GP"}}
@@ -0,0 +1,156 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from process.core import Elected
+from process.mandate import MandateIndex
+
+SEAT = "7501"
+
+
+def acteur(
+    ref: str,
+    uid: str,
+    start: str,
+    end: Optional[str] = None,
+    replaced_ref: Optional[str] = None,
+    suppleant_ref: Optional[str] = None,
+) -> Dict[str, Any]:
+    """An acteur document with a deputy mandat on SEAT from the general elections."""
+    mandat: Dict[str, Any] = {
+        "uid": uid,
+        "typeOrgane": "ASSEMBLEE",
+        "dateDebut": start,
+        "dateFin": end,
+        "election": {
+            "causeMandat": "Élections générales",
+            "lieu": {"numDepartement": "75", "numCirco": "1"},
+        },
+    }
+    if replaced_ref is not None:
+        mandat["mandature"] = {"mandatRemplaceRef": replaced_ref}
+    if suppleant_ref is not None:
+        mandat["suppleants"] = {"suppleant": {"suppleantRef": suppleant_ref}}
+    return {"acteur": {"uid": {"#text": ref}, "mandats": {"mandat": [mandat]}}}
+
+
+def deputy(ref: str, circonscription_code: str = SEAT) -> Elected:
+    return Elected(
+        ref=ref,
+        civ="M.",
+        last_name="Dupont",
+        first_name="Jean",
+        email="",
+        departement_num="75",
+        departement_name="Paris",
+        circonscription_num="1",
+        circonscription_name="1ère circonscription",
+        circonscription_code=circonscription_code,
+        country="France",
+        group_abv="",
+        group_name="",
+    )
+
+
+def resolve(documents: List[Dict[str, Any]]) -> MandateIndex:
+    mandates = MandateIndex()
+    mandates.add_acteurs(documents)
+    mandates.resolve()
+    return mandates
+
+
+def test_resolve_single_claim_has_no_conflict() -> None:
+    mandates = resolve([acteur("PA1", "PM1", "2024-07-18")])
+
+    assert mandates.holders[SEAT].acteur_ref == "PA1"
+    assert mandates.conflicts == []
+
+
+@pytest.mark.parametrize(
+    "documents, holder, other",
+    [
+        pytest.param(
+            [
+                acteur("PA1", "PM1", "2022-06-22"),
+                acteur("PA2", "PM2", "2022-07-22", replaced_ref="PM1"),
+            ],
+            "PA2",
+            ("PA1", "replaced"),
+            id="replaced",
+        ),
+        pytest.param(
+            [
+                acteur("PA1", "PM1", "2022-06-22", suppleant_ref="PA2"),
+                acteur("PA2", "PM2", "2022-07-22"),
+            ],
+            "PA2",
+            ("PA1", "substituted"),
+            id="substituted",
+        ),
+        pytest.param(
+            [
+                acteur("PA1", "PM1", "2024-07-18", end="2025-01-31"),
+                acteur("PA2", "PM2", "2022-06-22"),
+            ],
+            "PA2",
+            ("PA1", "ended"),
+            id="ended",
+        ),
+        pytest.param(
+            [
+                acteur("PA1", "PM1", "2022-06-22"),
+                acteur("PA2", "PM2", "2024-07-18"),
+            ],
+            "PA2",
+            ("PA1", "older"),
+            id="older",
+        ),
+        pytest.param(
+            [
+                acteur("PA1", "PM1", "2024-07-18"),
+                acteur("PA2", "PM2", "2024-07-18"),
+            ],
+            "PA1",
+            ("PA2", "undecided"),
+            id="undecided",
+        ),
+    ],
+)
+def test_resolve_gives_the_seat_to_its_current_holder(
+    documents: List[Dict[str, Any]], holder: str, other: Tuple[str, str]
+) -> None:
+    mandates = resolve(documents)
+
+    assert mandates.holders[SEAT].acteur_ref == holder
+    [conflict] = mandates.conflicts
+    assert conflict.circonscription_code == SEAT
+    assert conflict.holder.acteur_ref == holder
+    assert [(mandate.acteur_ref, reason) for mandate, reason in conflict.others] == [
+        other
+    ]
+
+
+def test_resolve_starts_over() -> None:
+    mandates = resolve(
+        [acteur("PA1", "PM1", "2022-06-22"), acteur("PA2", "PM2", "2024-07-18")]
+    )
+
+    assert mandates.resolve() == mandates.conflicts
+    assert len(mandates.conflicts) == 1
+
+
+def test_holds_seat() -> None:
+    mandates = resolve(
+        [acteur("PA1", "PM1", "2022-06-22"), acteur("PA2", "PM2", "2024-07-18")]
+    )
+
+    assert mandates.holds_seat(deputy("PA2"))
+    assert not mandates.holds_seat(deputy("PA1"))
+    # A seat nobody claimed, and a deputy without a seat
+    assert mandates.holds_seat(deputy("PA3", "9901"))
+    assert mandates.holds_seat(deputy("PA3", ""))
@@ -0,0 +1,165 @@
+# Copyright (C) 2026 zizanibot
+# See LICENSE file for extended copyright information.
+# This file is part of UpdateElectedDB project from https://github.com/zizanibot/UpdateElectedDB.
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from process.pgdump import iter_copy_rows, unescape_copy_value
+from process.senat import SENAT_DUMP_TABLES, export_from_dump_file
+
+# A small export_sens.sql: sen between two tables to skip, the values use the COPY escapes
+DUMP = r"""--
+-- PostgreSQL database dump
+--
+
+SET client_encoding = 'UTF8';
+
+COPY public.elusen (eluid, senmat, lib) FROM stdin;
+1	00001A	COPY public.sen (senmat) FROM stdin;
+2	00002B	\N
+\.
+
+COPY public.sen (senmat, quacod, sennomuse, senprenomuse, sennomtec, etasencod, sengrppolcodcou, sencirnumcou, senema, sendespro) FROM stdin;
+00001A	M.	Dupont	Jean	DUPONT	ACTIF	G1	75	j.dupont@senat.fr	Ligne 1\nLigne 2
+00002B	Mme	Martin	Anne	MARTIN	ANCIEN	G1	75	\N	\N
+00003C	Mme	D\\Arc	Jeanne	DARC	ACTIF	G2	2A	\N	Tab\tulation
+00004D	M.	Sans	Groupe	SANS	ACTIF	G9	75	\N	\N
+\.
+
+COPY public.dpt (dptnum, dptcod, dptlib) FROM stdin;
+75	75	Paris
+2A	2A	Corse-du-Sud
+\.
+
+COPY public.grppol (grppolcod, grppollilcou) FROM stdin;
+G1	Groupe\tUn
+G2	Groupe \"Deux\"
+\.
+
+COPY public.autre (id) FROM stdin;
+\.
+"""
+
+
+@pytest.fixture
+def dump_file(tmp_path: Path) -> Path:
+    path = tmp_path / "export_sens.sql"
+    path.write_text(DUMP, encoding="utf-8")
+    return path
+
+
+# Senators of the synthetic dump, one in five is active
+SENATORS = 200
+
+
+@pytest.fixture
+def synthetic_dump_file(tmp_path: Path) -> Path:
+    """A larger dump: sen is surrounded by a long table to skip, the group names are escaped."""
+    sen = "".join(
+        f"{index:05d}X\tM.\tNom{index}\tPrénom{index}\tNOM{index}\t"
+        f"{'ACTIF' if index % 5 == 0 else 'ANCIEN'}\tG{index % 4}\t75\t\\N\t\\N\n"
+        for index in range(SENATORS)
+    )
+    elusen = "".join(
+        f"{index}\t{index % SENATORS:05d}X\tLibellé {index}\n" for index in range(5000)
+    )
+    grppol = "".join(f"G{index}\tGroupe {index}\\tbis\n" for index in range(4))
+    path = tmp_path / "export_sens.sql"
+    path.write_text(
+        "COPY public.elusen (eluid, senmat, lib) FROM stdin;\n"
+        f"{elusen}\\.\n\n"
+        "COPY public.sen (senmat, quacod, sennomuse, senprenomuse, sennomtec, etasencod, "
+        "sengrppolcodcou, sencirnumcou, senema, sendespro) FROM stdin;\n"
+        f"{sen}\\.\n\n"
+        "COPY public.dpt (dptnum, dptcod, dptlib) FROM stdin;\n75\t75\tParis\n\\.\n\n"
+        "COPY public.grppol (grppolcod, grppollilcou) FROM stdin;\n"
+        f"{grppol}\\.\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("\\N", None),
+        ("plain", "plain"),
+        ("a\\tb", "a\tb"),
+        ("a\\nb", "a\nb"),
+        ("a\\\\b", "a\\b"),
+        ("\\101\\x42", "AB"),
+        ("\\N\\N", "NN"),
+    ],
+)
+def test_unescape_copy_value(value: str, expected: Optional[str]) -> None:
+    assert unescape_copy_value(value) == expected
+
+
+def test_iter_copy_rows_skips_other_tables(dump_file: Path) -> None:
+    rows = list(iter_copy_rows(dump_file, SENAT_DUMP_TABLES))
+
+    assert {table for table, _ in rows} == {"sen", "dpt", "grppol"}
+    assert [row["senmat"] for table, row in rows if table == "sen"] == [
+        "00001A",
+        "00002B",
+        "00003C",
+        "00004D",
+    ]
+
+
+def test_iter_copy_rows_decodes_values(dump_file: Path) -> None:
+    rows = list(iter_copy_rows(dump_file, {"sen": ("senmat", "sennomuse", "senema")}))
+    senators = {row["senmat"]: row for _, row in rows}
+
+    # Only the wanted columns are kept
+    assert set(senators["00001A"]) == {"senmat", "sennomuse", "senema"}
+    assert senators["00001A"]["senema"] == "j.dupont@senat.fr"
+    assert senators["00002B"]["senema"] is None
+    assert senators["00003C"]["sennomuse"] == "D\\Arc"
+
+
+def test_iter_copy_rows_missing_column(dump_file: Path) -> None:
+    with pytest.raises(ValueError):
+        list(iter_copy_rows(dump_file, {"sen": ("senmat", "unknown")}))
+
+
+def test_export_from_dump_file(dump_file: Path) -> None:
+    assert export_from_dump_file(dump_file) == [
+        {
+            "senmat": "00001A",
+            "quacod": "M.",
+            "sennomuse": "Dupont",
+            "senprenomuse": "Jean",
+            "dptcod": "75",
+            "dptlib": "Paris",
+            "grppolcod": "G1",
+            "grppollilcou": "Groupe\tUn",
+            "senema": "j.dupont@senat.fr",
+        },
+        {
+            "senmat": "00003C",
+            "quacod": "Mme",
+            "sennomuse": "D\\Arc",
+            "senprenomuse": "Jeanne",
+            "dptcod": "2A",
+            "dptlib": "Corse-du-Sud",
+            "grppolcod": "G2",
+            "grppollilcou": 'Groupe "Deux"',
+            "senema": None,
+        },
+    ]
+
+
+def test_export_from_synthetic_dump(synthetic_dump_file: Path) -> None:
+    rows = export_from_dump_file(synthetic_dump_file)
+
+    assert len(rows) == SENATORS // 5
+    assert {row["senmat"] for row in rows} == {
+        f"{index:05d}X" for index in range(0, SENATORS, 5)
+    }
+    assert all((row["grppollilcou"] or "").startswith("Groupe ") for row in rows)
+    assert any("\t" in (row["grppollilcou"] or "") for row in rows)